@@ -0,0 +1,3 @@
+#!/usr/bin/env python3
+
+# Offline benchmarks, run as modules from the repository root, e.g. python -m benchmarks.run
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+# Per call cost of getting a web3 contract and building one function call, uncached (a new eth.contract
+# every time, as ExchangeInterface did before) against ExchangeInterface.contract. No node is needed,
+# nothing is sent. Run from the repository root: python -m benchmarks.contract_cache
+
+import timeit
+from types import SimpleNamespace
+
+from web3 import Web3, HTTPProvider
+from saturnpy.exchange import ExchangeInterface, EXCHANGECONFIG, ERC20
+
+N = 2000
+EXCHANGE = EXCHANGECONFIG["address"]["ETC"]
+TOKEN = "0xac55641cbb734bdf6510d1bbd62e240c2409040f"
+TRADER = "0x0000000000000000000000000000000000000001"
+
+provider = Web3(HTTPProvider("http://localhost:8545"))
+# only the attributes ExchangeInterface.contract uses
+exchange = SimpleNamespace(provider=provider, contracts={})
+
+def uncached():
+    provider.eth.contract(address=Web3.toChecksumAddress(EXCHANGE), abi=EXCHANGECONFIG["abi"]).functions.remainingAmount(1)
+    provider.eth.contract(address=Web3.toChecksumAddress(TOKEN), abi=ERC20).functions.balanceOf(TRADER)
+
+def cached():
+    ExchangeInterface.contract(exchange, EXCHANGE).functions.remainingAmount(1)
+    ExchangeInterface.contract(exchange, TOKEN, "erc20").functions.balanceOf(TRADER)
+
+if __name__ == "__main__":
+    for name, fn in (("uncached", uncached), ("cached", cached)):
+        fn()
+        seconds = min(timeit.repeat(fn, number=N, repeat=3))
+        print(f"{name:10} {seconds / N * 1e6:10.1f} us per call")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+# In process stand-in for the ticker api and an ETC node. GET /api/v2/... serves the fixtures, POST /rpc
+# answers the JSON-RPC calls saturnpy makes (single or batched). The exchange contract is mocked by
+# 4-byte selector, every sent transaction is "mined" at once. Requests are counted per route / rpc method.
+
+import json
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_utils import keccak
+
+from saturnpy.capacity import buyTokenAmount
+from saturnpy.fixed import scaledPrice
+
+from .fixtures import EXCHANGE, TOKEN, OWNER, ETHER, ORDERS, load
+
+BALANCE = 10 ** 30
+REMAINING = 10 ** 24
+DECIMALS = 4
+FEE_MUL, FEE_DIV = 1, 1000
+TOKEN_CODE = "0x6080604052" + "095ea7b3" + "a9059cbb" + "00" * 32 # erc20, has approve but no erc223 transfer
+
+def word(value):
+    if isinstance(value, str):
+        value = int(value, 16)
+    return format(value, "064x")
+
+def selector(signature):
+    return keccak(text=signature)[:4].hex()
+
+NEW_ORDER_TOPIC = "0x" + keccak(text="NewOrder(uint256,address,address,address,address,uint256,uint256,uint256,uint256)").hex()
+
+class FakeChain(object):
+    def __init__(self, chain_id=61):
+        self.chain_id = chain_id
+        self.block = 1
+        self.sent = {}  # txhash -> raw transaction
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self.calls = {
+            selector("remainingAmount(uint256)"): lambda args: REMAINING,
+            selector("getBuyTokenAmount(uint256,uint256)"): self.buyTokenAmount,
+            selector("feeMul()"): lambda args: FEE_MUL,
+            selector("feeDiv()"): lambda args: FEE_DIV,
+            selector("balanceOf(address)"): lambda args: BALANCE,
+            selector("allowance(address,address)"): lambda args: BALANCE,
+            selector("decimals()"): lambda args: DECIMALS
+        }
+        self.orders = {order["tx"]: order for order in ORDERS}
+        book = load("orderbook")
+        for order in book["buys"] + book["sells"]:
+            # wei per subtoken, sell orders store it as priceDiv / priceMul
+            mul, div = scaledPrice(order["price"], 10 ** 18, 10 ** DECIMALS)
+            if order["type"] == "SELL":
+                mul, div = div, mul
+            self.orders[order["transaction"]] = {"order_id": order["order_id"], "tx": order["transaction"],
+                                                 "type": order["type"], "mul": mul, "div": div}
+
+    def buyTokenAmount(self, args):
+        amount, order_id = int(args[0], 16), int(args[1], 16)
+        order = next((o for o in self.orders.values() if o["order_id"] == order_id), {"mul": 1, "div": 10000})
+        return buyTokenAmount(amount, order["mul"], order["div"], FEE_MUL, FEE_DIV)
+
+    def newOrderLog(self, order, index=0):
+        # every fixture order was created in block 1
+        sell_token, buy_token = (TOKEN, ETHER) if order["type"] == "SELL" else (ETHER, TOKEN)
+        data = "".join(word(v) for v in (
+            order["order_id"], OWNER, sell_token, buy_token, ETHER, REMAINING, order["mul"], order["div"], 1577836800
+        ))
+        return {
+            "address": EXCHANGE, "topics": [NEW_ORDER_TOPIC], "data": "0x" + data,
+            "blockNumber": "0x1", "blockHash": "0x" + "11" * 32, "transactionHash": order["tx"],
+            "transactionIndex": hex(index), "logIndex": hex(index), "removed": False
+        }
+
+    def logs(self, query):
+        if int(query.get("fromBlock", "0x0"), 16) > 1 or int(query.get("toBlock", "0x1"), 16) < 1:
+            return []
+        return [self.newOrderLog(order, i) for i, order in enumerate(self.orders.values())]
+
+    def receipt(self, txhash):
+        logs = []
+        order = self.orders.get(txhash)
+        if order is not None:
+            logs.append(self.newOrderLog(order))
+        elif txhash not in self.sent:
+            return None
+        return {
+            "transactionHash": txhash, "transactionIndex": "0x0", "blockHash": "0x" + "11" * 32,
+            "blockNumber": "0x1", "from": OWNER, "to": EXCHANGE, "cumulativeGasUsed": "0x5208",
+            "gasUsed": "0x5208", "contractAddress": None, "logs": logs, "status": "0x1",
+            "logsBloom": "0x" + "00" * 256
+        }
+
+    def call(self, tx):
+        data = tx["data"][2:] if tx["data"].startswith("0x") else tx["data"]
+        fn = self.calls.get(data[:8])
+        if fn is None:
+            raise Exception(f"unknown call {data[:8]}")
+        args = [data[i:i + 64] for i in range(8, len(data), 64)]
+        return "0x" + word(fn(args))
+
+    def handle(self, method, params):
+        self.counts[method] += 1
+        if method == "eth_chainId":
+            return hex(self.chain_id)
+        if method == "net_version":
+            return str(self.chain_id)
+        if method == "eth_blockNumber":
+            with self._lock:
+                self.block += 1
+                return hex(self.block)
+        if method == "eth_gasPrice":
+            return hex(10 ** 9)
+        if method == "eth_getBalance":
+            return hex(BALANCE)
+        if method == "eth_getTransactionCount":
+            return hex(len(self.sent))
+        if method == "eth_getCode":
+            return TOKEN_CODE if params[0].lower() == TOKEN else "0x"
+        if method == "eth_call":
+            return self.call(params[0])
+        if method == "eth_getLogs":
+            return self.logs(params[0])
+        if method == "eth_getTransactionReceipt":
+            return self.receipt(params[0].lower())
+        if method == "eth_sendRawTransaction":
+            raw = params[0]
+            txhash = "0x" + keccak(hexstr=raw).hex()
+            with self._lock:
+                self.sent[txhash] = raw
+            return txhash
+        raise Exception(f"method {method} not supported")
+
+    def request(self, request):
+        try:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "result": self.handle(request["method"], request.get("params", []))}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32601, "message": str(e)}}
+
+ROUTES = [
+    (re.compile(r"/api/v2/orders/by_tx/\w+/(0x[0-9a-f]+)\.json"), lambda m: load(f"order_{m.group(1)}")),
+    (re.compile(r"/api/v2/orders/trader/0x[0-9a-f]+\.json"), lambda m: load("trader")),
+    (re.compile(r"/api/v2/orders/\w+/0x[0-9a-f]+/0x0+/all\.json"), lambda m: load("orderbook")),
+    (re.compile(r"/api/v2/tokens/ohlcv/\w+/0x[0-9a-f]+/24h\.json"), lambda m: load("ohlcv")),
+    (re.compile(r"/api/v2/tokens/show/\w+/0x[0-9a-f]+\.json"), lambda m: load("token")),
+    (re.compile(r"/api/v2/trades/\w+/0x[0-9a-f]+/0x0+/all\.json"), lambda m: load("trades")),
+]
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive, like the real api
+    wbufsize = -1                 # headers and body in one write, unbuffered writes hit the 40ms delayed ack
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body):
+        body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        for pattern, fixture in ROUTES:
+            m = pattern.fullmatch(path)
+            if m is not None:
+                self.server.counts["GET " + pattern.pattern] += 1
+                try:
+                    return self.reply(200, fixture(m))
+                except FileNotFoundError:
+                    break
+        self.server.counts["GET 404"] += 1
+        self.reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        chain = self.server.chain
+        if isinstance(body, list):
+            chain.counts["batch"] += 1
+            return self.reply(200, [chain.request(r) for r in body])
+        self.reply(200, chain.request(body))
+
+class FakeNode(object):
+    # with FakeNode() as node: Saturn({... "apiUrl": node.apiurl, "providerUrl": node.rpcurl ...})
+    def __init__(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.server.chain = self.chain = FakeChain()
+        self.server.counts = Counter()
+        url = f"http://{host}:{self.server.server_address[1]}"
+        self.apiurl = url + "/api/v2/"
+        self.rpcurl = url + "/rpc"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def counts(self):
+        # rpc methods and ticker routes requested so far
+        counts = Counter(self.chain.counts)
+        counts.update(self.server.counts)
+        return counts
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+# Timing of saturnpy.fixed against the Decimal / Fraction helpers that utils used before (tests/legacy_fixed.py,
+# tests/test_fixed.py checks both give the same results). No node is needed.
+# Run from the repository root: python -m benchmarks.fixed_point
+
+import random
+import timeit
+from fractions import Fraction
+
+from saturnpy import fixed
+from tests.legacy_fixed import legacyToFixed, legacyMentDecimal, legacyIntVerify, legacyToSbtkn, decimalString
+
+SEED = 20200101
+N = 20000
+
+def timing():
+    rnd = random.Random(SEED)
+    amounts = [decimalString(rnd).lstrip("+-") for _ in range(100)]
+    prices = [f"0.{rnd.randint(1, 99999):05d}" for _ in range(100)]
+    exp_decimals = 10 ** 4
+    pairs = (
+        ("toFixed", lambda: [legacyToFixed(a) for a in amounts], lambda: [fixed.toFixed(a) for a in amounts]),
+        ("mentDecimal", lambda: [legacyMentDecimal(a, 1) for a in amounts], lambda: [fixed.mentDecimal(a, 1) for a in amounts]),
+        ("toSbtkn", lambda: [legacyToSbtkn(a, exp_decimals, False) for a in amounts],
+            lambda: [fixed.toSbtkn(a, exp_decimals, False) for a in amounts]),
+        ("intVerify", lambda: [legacyIntVerify(a, False) for a in amounts], lambda: [fixed.intVerify(a, False) for a in amounts]),
+        # the amount and price part of ExchangeInterface.orderAmounts
+        ("order amounts", lambda: [
+            legacyIntVerify(legacyToSbtkn(Fraction(a), exp_decimals, False) * (Fraction(p) * 10 ** 18 / exp_decimals), False)
+            for a, p in zip(amounts, prices)
+        ], lambda: [
+            fixed.truncate(fixed.toSbtkn(a, exp_decimals, False) * m, d, False)
+            for a, (m, d) in ((a, fixed.scaledPrice(p, 10 ** 18, exp_decimals)) for a, p in zip(amounts, prices))
+        ]),
+    )
+    n = max(1, N // len(amounts))
+    for name, old, new in pairs:
+        t_old = min(timeit.repeat(old, number=n, repeat=3)) / (n * len(amounts))
+        t_new = min(timeit.repeat(new, number=n, repeat=3)) / (n * len(amounts))
+        print(f"{name:14} old {t_old * 1e6:7.2f} us  new {t_new * 1e6:7.2f} us  {t_old / t_new:5.1f}x")
+
+if __name__ == "__main__":
+    timing()
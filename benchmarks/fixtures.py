@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Ticker api fixtures for the offline benchmarks. The json files in benchmarks/fixtures are generated
+# from fixed seeds by this module, run it to rebuild them: python -m benchmarks.fixtures
+
+import json
+import os
+import random
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+BLOCKCHAIN = "etc"
+EXCHANGE = "0x5EF83Ab1155786f146c5A00722bEF7aB683Dc0DE"
+ETHER = "0x0000000000000000000000000000000000000000"
+TOKEN = "0xac55641cbb734bdf6510d1bbd62e240c2409040f"
+OWNER = "0x1111111111111111111111111111111111111111"
+MNEMONIC = "legal winner thank year wave sausage worth useful legal winner thank yellow"
+
+# the two orders newTrade is measured against, price is priceMul / priceDiv in the NewOrder event
+SELL_ORDER = {"order_id": 101, "tx": "0x" + "a1" * 32, "type": "SELL", "mul": 1, "div": 10000}
+BUY_ORDER = {"order_id": 102, "tx": "0x" + "b2" * 32, "type": "BUY", "mul": 10000, "div": 1}
+ORDERS = (SELL_ORDER, BUY_ORDER)
+
+BOOK_SIZE = 200
+CANDLES = 500
+TRADES = 1000
+
+def orderJson(order_id, tx, order_type, price, balance, owner=OWNER):
+    token = {"address": TOKEN, "symbol": "SATURN", "decimals": 4}
+    ether = {"address": ETHER, "symbol": "ETC", "decimals": 18}
+    return {
+        "order_id": order_id,
+        "transaction": tx,
+        "contract": EXCHANGE.lower(),
+        "owner": owner,
+        "type": order_type,
+        "active": True,
+        "price": price,
+        "balance": balance,
+        "buytoken": token if order_type == "BUY" else ether,
+        "selltoken": ether if order_type == "BUY" else token,
+        "created_at": "2020-01-01T00:00:00Z"
+    }
+
+def build():
+    rnd = random.Random(20200101)
+    files = {}
+    for order in ORDERS:
+        files[f"order_{order['tx']}"] = orderJson(order["order_id"], order["tx"], order["type"], "0.0001", "1000000")
+
+    buys, sells = [], []
+    for i in range(BOOK_SIZE):
+        order_type = "BUY" if i % 2 else "SELL"
+        price = round(0.0001 + (rnd.random() - (0.5 if order_type == "BUY" else 0)) * 0.00005, 8)
+        data = orderJson(1000 + i, "0x%064x" % (1000 + i), order_type, f"{price:.8f}", f"{rnd.randint(1, 100000)}")
+        (buys if order_type == "BUY" else sells).append(data)
+    files["orderbook"] = {"buys": buys, "sells": sells}
+
+    close = 0.0001
+    candles = []
+    for i in range(CANDLES):
+        open_ = close
+        close = max(0.00001, open_ * (1 + rnd.gauss(0, 0.02)))
+        candles.append({
+            "time": 1577836800 + i * 3600,
+            "open": f"{open_:.8f}", "high": f"{max(open_, close) * 1.01:.8f}",
+            "low": f"{min(open_, close) * 0.99:.8f}", "close": f"{close:.8f}",
+            "volume": f"{rnd.uniform(10, 1000):.4f}"
+        })
+    files["ohlcv"] = candles
+
+    files["trades"] = [{
+        "transaction": "0x%064x" % (10 ** 6 + i),
+        "order_id": 1000 + rnd.randrange(BOOK_SIZE),
+        "type": rnd.choice(["BUY", "SELL"]),
+        "buyer": "0x%040x" % rnd.getrandbits(160),
+        "seller": "0x%040x" % rnd.getrandbits(160),
+        "price": f"{rnd.uniform(0.00008, 0.00012):.8f}",
+        "amount": f"{rnd.uniform(1, 5000):.4f}",
+        "timestamp": 1577836800 + i * 60
+    } for i in range(TRADES)]
+
+    files["token"] = {
+        "address": TOKEN, "symbol": "SATURN", "name": "Saturn DAO Token", "decimals": 4,
+        "best_buy_order_tx": BUY_ORDER["tx"], "best_sell_order_tx": SELL_ORDER["tx"]
+    }
+    files["trader"] = {"sell_orders": sells[:20], "buy_orders": buys[:20]}
+    return files
+
+def load(name):
+    with open(os.path.join(FIXTURES, f"{name}.json")) as x:
+        return json.load(x)
+
+if __name__ == "__main__":
+    os.makedirs(FIXTURES, exist_ok=True)
+    for name, data in build().items():
+        with open(os.path.join(FIXTURES, f"{name}.json"), "w") as x:
+            json.dump(data, x, indent=1)
+        print(f"wrote {name}.json")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+# Offline benchmark of the saturnpy hot paths against benchmarks.fake_node. Prints latency percentiles
+# and the rpc / ticker requests each call makes. Run from the repository root:
+#   python -m benchmarks.fixtures   (only to rebuild the fixtures)
+#   python -m benchmarks.run [iterations]
+
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+from saturnpy import Saturn
+from saturnpy.utils import toFixed
+from saturnpy.mnemonic_utils import mnemonic_to_private_key
+
+from .fake_node import FakeNode
+from .fixtures import BLOCKCHAIN, TOKEN, MNEMONIC, SELL_ORDER, BUY_ORDER, load
+
+ITERATIONS = 200
+
+def settings(node):
+    return {
+        "blockchain": BLOCKCHAIN,
+        "apiUrl": node.apiurl,
+        "providerUrl": node.rpcurl,
+        "mnemonicKey": MNEMONIC,
+        "receiptPollInterval": 0.001,
+        "DEBUG": False
+    }
+
+def measure(node, name, fn, n):
+    fn() # warm up caches and connections, like a long running bot
+    before = node.counts()
+    times = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    requests = node.counts()
+    requests.subtract(before)
+    q = statistics.quantiles(times, n=100) if n > 1 else times * 99
+    per_call = ", ".join(f"{k} {v / n:g}" for k, v in sorted(requests.items()) if v)
+    print(f"{name:24} p50 {q[49] * 1e3:9.3f} ms  p90 {q[89] * 1e3:9.3f} ms  p99 {q[98] * 1e3:9.3f} ms")
+    print(f"{'':24} per call: {per_call or 'no requests'}")
+
+def main(n=ITERATIONS):
+    with FakeNode() as node:
+        saturn = Saturn(settings(node))
+        sell_order = saturn.query.getOrderByTx(SELL_ORDER["tx"])
+        book = load("orderbook")
+        book_orders = book["buys"] + book["sells"]
+
+        measure(node, "toFixed", lambda: toFixed(Decimal("123456.789000000000001")), n * 50)
+        measure(node, "mnemonic_to_private_key", lambda: mnemonic_to_private_key(MNEMONIC), max(2, n // 20))
+        measure(node, "HDWallet.child_key", lambda: saturn.hdwallet.child_key(1), n * 10)
+        measure(node, "AbiDecoder.allEvents", lambda: saturn.exchange.decoder.allEvents(SELL_ORDER["tx"]), n)
+        measure(node, "verifyCapacity", lambda: saturn.exchange.verifyCapacity("200", sell_order), n)
+        measure(node, "capacities (book)", lambda: saturn.exchange.capacities(book_orders, "1"), n)
+        measure(node, "newOrder", lambda: saturn.exchange.newOrder(TOKEN, "buy", "1", "0.0001"), n)
+        measure(node, "newTrade (sell order)", lambda: saturn.exchange.newTrade("1", SELL_ORDER["tx"]), n)
+        measure(node, "newTrade (buy order)", lambda: saturn.exchange.newTrade("1", BUY_ORDER["tx"]), n)
+        saturn.exchange.pipeline.close()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+# Import and startup time of saturnpy, each measured in a fresh interpreter, checked against a budget.
+# Exits with status 1 when a median is over budget or a heavy module is imported where it should not be.
+#   python -m benchmarks.startup [runs]
+
+import json
+import statistics
+import subprocess
+import sys
+
+from .fixtures import MNEMONIC
+
+RUNS = 5
+BUDGET = {           # ms, median of RUNS fresh interpreters
+    "import": 50,    # import saturnpy
+    "startup": 800   # from saturnpy import Saturn; Saturn(settings), no network
+}
+# modules that must not be loaded by then
+NOT_LOADED = {
+    "import": ["web3", "eth_account", "pandas", "numpy", "ethereum", "ecdsa"],
+    "startup": ["pandas", "numpy", "ethereum", "aiohttp"]
+}
+
+SETTINGS = {
+    "blockchain": "ETC",
+    "apiUrl": "http://127.0.0.1:9/api/v2/",
+    "providerUrl": "http://127.0.0.1:9/rpc",
+    "mnemonicKey": MNEMONIC
+}
+
+SCRIPTS = {
+    "import": "import saturnpy",
+    "startup": f"from saturnpy import Saturn; Saturn({SETTINGS!r})"
+}
+
+PROBE = """
+import sys, time, json, io, contextlib
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    exec({script!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": [m for m in {modules!r} if m in sys.modules]}}))
+"""
+
+def measure(name, runs):
+    samples = []
+    for _ in range(runs):
+        probe = PROBE.format(script=SCRIPTS[name], modules=NOT_LOADED[name])
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(out.splitlines()[-1]))
+    return statistics.median(s["ms"] for s in samples), samples[-1]["modules"]
+
+def main(runs=RUNS):
+    ok = True
+    for name in SCRIPTS:
+        ms, loaded = measure(name, runs)
+        over = ms > BUDGET[name]
+        ok = ok and not over and not loaded
+        status = "OVER BUDGET" if over else "ok"
+        print(f"{name:8} {ms:8.1f} ms  budget {BUDGET[name]:6} ms  {status}")
+        if loaded:
+            print(f"{'':8} loaded eagerly: {', '.join(loaded)}")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if main(int(sys.argv[1]) if len(sys.argv) > 1 else RUNS) else 1)
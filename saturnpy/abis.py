@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+# Contract abis shipped with the package. Each json file is read on first use and shared afterwards,
+# so the same abi object is handed to every contract, decoder and calldata template.
+
+import json
+import os
+from functools import lru_cache
+
+from .tx_pipeline import CallTemplates
+
+ABSOLUTEPATH = os.path.abspath(os.path.dirname(__file__))
+ABI_FILES = {
+    "erc20": "erc20.json",
+    "erc223": "erc223.json"
+}
+
+@lru_cache(maxsize=None)
+def loadJson(filename):
+    with open(os.path.join(ABSOLUTEPATH, filename)) as x:
+        return json.load(x)
+
+def exchangeConfig():
+    return loadJson("exchangeConfig.json")
+
+def abi(kind):
+    if kind == "exchange":
+        return exchangeConfig()["abi"]
+    return loadJson(ABI_FILES[kind])
+
+@lru_cache(maxsize=None)
+def calls(kind):
+    # calldata templates for the transactions sent to contracts of this abi kind
+    return CallTemplates(abi(kind))
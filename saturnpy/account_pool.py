@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+# Several trading accounts behind one interface. Every account has its own ExchangeInterface (own nonces),
+# all of them share the provider, query, token and order registries, gas oracle and transaction pipeline.
+# next() hands the accounts out round robin, shard(key) always maps the same key (a token address,
+# a strategy name) to the same account.
+
+import itertools
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .tx_batch import TxBatch
+from .utils import checksum
+
+class AccountPool(object):
+    def __init__(self, exchanges):
+        self.exchanges = list(exchanges)
+        if not self.exchanges:
+            raise Exception('ACCOUNT POOL NEEDS AT LEAST ONE ACCOUNT')
+        self.byAddress = {checksum(e.wallet.address): e for e in self.exchanges}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.exchanges)
+
+    def __iter__(self):
+        return iter(self.exchanges)
+
+    def __getitem__(self, i):
+        return self.exchanges[i]
+
+    @property
+    def addresses(self):
+        return [e.wallet.address for e in self.exchanges]
+
+    def exchangeFor(self, address):
+        exchange = self.byAddress.get(checksum(address))
+        if exchange is None:
+            raise Exception(f'ADDRESS {address} IS NOT IN THE ACCOUNT POOL')
+        return exchange
+
+    def next(self):
+        with self._lock:
+            i = next(self._counter)
+        return self.exchanges[i % len(self.exchanges)]
+
+    def shard(self, key):
+        # crc32, unlike hash(), is the same in every process
+        return self.exchanges[zlib.crc32(str(key).lower().encode()) % len(self.exchanges)]
+
+    def pick(self, shard_key=None):
+        if shard_key is None:
+            return self.next()
+        return self.shard(shard_key)
+
+    def newOrder(self, token_address, order_type, amount, price, shard_key=None):
+        return self.pick(shard_key).newOrder(token_address, order_type, amount, price)
+
+    def newTrade(self, amount, orderTx, shard_key=None):
+        return self.pick(shard_key).newTrade(amount, orderTx)
+
+    def cancelOrder(self, order_id, owner, contract=None):
+        # orders can only be cancelled by the account that created them
+        return self.exchangeFor(owner).cancelOrder(order_id, contract)
+
+    def newOrders(self, orders, shard=False, order_contract=None) -> TxBatch:
+        # orders is a list of (token_address, order_type, amount, price), spread round robin over the accounts,
+        # or by token address with shard=True. Each account checks and sends its share with newOrders,
+        # concurrently, the returned batch has the transactions in request order. An account that fails as a
+        # whole has its exception in errors for each of its orders, the other accounts' transactions are kept.
+        groups = {}
+        for i, order in enumerate(orders):
+            exchange = self.shard(order[0]) if shard else self.next()
+            groups.setdefault(id(exchange), (exchange, []))[1].append(i)
+        if not groups:
+            return TxBatch(self.exchanges[0].provider, self.exchanges[0].query.watcher, [])
+
+        with ThreadPoolExecutor(len(groups)) as executor:
+            results = [
+                (indexes, executor.submit(exchange.newOrders, [orders[i] for i in indexes], order_contract))
+                for exchange, indexes in groups.values()
+            ]
+            txhashes = [None] * len(orders)
+            errors = {}
+            for indexes, future in results:
+                try:
+                    batch = future.result()
+                except Exception as e:
+                    for i in indexes:
+                        errors[i] = e
+                    continue
+                for j, i in enumerate(indexes):
+                    txhashes[i] = batch.txhashes[j]
+                    if j in batch.errors:
+                        errors[i] = batch.errors[j]
+        return TxBatch(self.exchanges[0].provider, self.exchanges[0].query.watcher, txhashes, errors)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+# asyncio counterpart of RequestManager, all ticker api queries share one pooled aiohttp session.
+# Bulk methods fan out over many tokens at once, bounded by a semaphore.
+
+import asyncio
+import aiohttp
+
+from .cache import TTLCache, MISSING
+from .request_manager import (
+    CACHE_SIZE, CACHE_TTL,
+    HTTP_POOL_MAXSIZE, HTTP_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF
+)
+from .utils import etheraddress
+
+ASYNC_CONCURRENCY = 16 # max requests in flight per AsyncRequestManager
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+class AsyncRequestManager():
+    payload = {'Origin': 'saturnpy'}
+    def __init__(self, apiurl, blockchain, concurrency=ASYNC_CONCURRENCY, timeout=HTTP_TIMEOUT,
+                 pool_maxsize=HTTP_POOL_MAXSIZE, retries=HTTP_RETRIES, backoff=HTTP_BACKOFF,
+                 cache=None, ttl=None, session=None):
+        self.apiurl = apiurl
+        self.blockchain = blockchain
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff = backoff
+        if cache is None:
+            cache = TTLCache(CACHE_SIZE)
+        self.cache = cache
+        self.ttl = dict(CACHE_TTL)
+        if ttl is not None:
+            self.ttl.update(ttl)
+        self.session: aiohttp.ClientSession = session
+        self._semaphore = None
+
+    # the session and semaphore bind to the running loop, so they are created on first use
+    def _client(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.pool_maxsize)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def get(self, url: str, params=None):
+        if params is None:
+            params = self.payload
+        session = self._client()
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    async with session.get(url, params=params) as response:
+                        if response.status not in RETRY_STATUS or attempt >= self.retries:
+                            if response.status >= 400:
+                                raise Exception(f"ERROR GET URL: {url}")
+                            return await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    if attempt >= self.retries:
+                        raise Exception(f"ERROR GET URL: {url}")
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def getCached(self, endpoint: str, key: str, url: str):
+        ttl = self.ttl.get(endpoint, 0)
+        if ttl == 0:
+            return await self.get(url)
+        data = self.cache.get((endpoint, key), MISSING)
+        if data is MISSING:
+            data = await self.get(url)
+            if data:
+                self.cache.set((endpoint, key), data, ttl)
+        return data
+
+    def invalidate(self, endpoint: str = None, key: str = None):
+        if endpoint is None:
+            self.cache.clear()
+        elif key is None:
+            self.cache.invalidateWhere(lambda k: k[0] == endpoint)
+        else:
+            self.cache.invalidate((endpoint, key))
+
+    async def getTransaction(self, tx: str):
+        url = f"{self.apiurl}transactions/{self.blockchain}/{tx}.json"
+        return await self.getCached("getTransaction", tx.lower(), url)
+
+    async def getOrderByTx(self, tx: str):
+        url = f"{self.apiurl}orders/by_tx/{self.blockchain}/{tx}.json"
+        return await self.getCached("getOrderByTx", tx.lower(), url)
+
+    async def getTradeByTx(self, tx: str):
+        url = f"{self.apiurl}trades/by_tx/{self.blockchain}/{tx}.json"
+        return await self.getCached("getTradeByTx", tx.lower(), url)
+
+    async def getTokenInfo(self, address: str):
+        url = f"{self.apiurl}tokens/show/{self.blockchain}/{address.lower()}.json"
+        return await self.getCached("getTokenInfo", address.lower(), url)
+
+    async def getExchangeContract(self, blockchain=None):
+        if blockchain is None:
+            blockchain = self.blockchain
+        url = f"{self.apiurl}orders/contracts.json"
+        data = await self.getCached("getExchangeContract", "contracts", url)
+        return data[blockchain.upper()]
+
+    async def orderbook(self, token: str):
+        url = f"{self.apiurl}orders/{self.blockchain}/{token.lower()}/{str(etheraddress)}/all.json"
+        return await self.get(url)
+
+    async def ohlcv(self, token: str):
+        url = f"{self.apiurl}tokens/ohlcv/{self.blockchain}/{token.lower()}/24h.json"
+        return await self.get(url)
+
+    async def tradeHistory(self, token: str):
+        url = f"{self.apiurl}trades/{self.blockchain}/{token.lower()}/{etheraddress.lower()}/all.json"
+        return await self.get(url)
+
+# BULK QUERIES, results are returned in the order of the requested tokens
+
+    async def orderbooks(self, tokens):
+        return await asyncio.gather(*[self.orderbook(token) for token in tokens])
+
+    async def ohlcvs(self, tokens):
+        return await asyncio.gather(*[self.ohlcv(token) for token in tokens])
+
+    async def tokenInfos(self, tokens):
+        return await asyncio.gather(*[self.getTokenInfo(token) for token in tokens])
+
+    async def tradeHistories(self, tokens):
+        return await asyncio.gather(*[self.tradeHistory(token) for token in tokens])
+
+    async def ordersByTx(self, txs):
+        return await asyncio.gather(*[self.getOrderByTx(tx) for tx in txs])
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+# Collects several JSON-RPC calls and sends them as one batch request. HTTP providers get a single
+# POST through the pooled session, other providers fall back to sending the calls one by one.
+
+from eth_abi import decode_single
+from hexbytes import HexBytes
+from web3 import Web3, HTTPProvider
+
+class RpcBatch(object):
+    def __init__(self, provider, session=None, timeout=None):
+        self.provider: Web3 = provider
+        self.session = session
+        self.timeout = timeout
+        self.calls = [] # (method, params, decode)
+
+    def __len__(self):
+        return len(self.calls)
+
+    def add(self, method, params, decode=None):
+        self.calls.append((method, params, decode))
+        return len(self.calls) - 1
+
+    def call(self, contract_address, data, output_type="uint256"):
+        decode = lambda result: decode_single(output_type, bytes(HexBytes(result)))
+        return self.add("eth_call", [{"to": contract_address, "data": data}, "latest"], decode)
+
+    def contractCall(self, contract, fn_name, args, output_type="uint256"):
+        return self.call(contract.address, contract.encodeABI(fn_name=fn_name, args=args), output_type)
+
+    def getBalance(self, address):
+        return self.add("eth_getBalance", [address, "latest"], lambda result: int(HexBytes(result).hex(), 16))
+
+    def getTransactionReceipt(self, txhash):
+        return self.add("eth_getTransactionReceipt", [txhash])
+
+    def getTransactionCount(self, address, block="pending"):
+        return self.add("eth_getTransactionCount", [address, block], lambda result: int(HexBytes(result).hex(), 16))
+
+    def sendRawTransaction(self, raw_tx):
+        return self.add("eth_sendRawTransaction", [HexBytes(raw_tx).hex()])
+
+    def __send(self, raise_errors):
+        backend = self.provider.provider
+        if self.session is None or not isinstance(backend, HTTPProvider):
+            results = []
+            for method, params, _ in self.calls:
+                try:
+                    results.append(self.provider.manager.request_blocking(method, params))
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    results.append(e)
+            return results
+
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params, _) in enumerate(self.calls)
+        ]
+        try:
+            response = self.session.post(backend.endpoint_uri, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            responses = response.json()
+        except Exception:
+            raise Exception(f"ERROR SENDING RPC BATCH TO {backend.endpoint_uri}")
+
+        if not isinstance(responses, list):
+            raise Exception(f'RPC BATCH NOT SUPPORTED: {responses}')
+
+        results = [None] * len(self.calls)
+        for item in responses:
+            if "error" in item:
+                method = self.calls[item["id"]][0]
+                error = Exception(f'RPC ERROR {method}: {item["error"]}')
+                if raise_errors:
+                    raise error
+                results[item["id"]] = error
+            else:
+                results[item["id"]] = item["result"]
+        return results
+
+    def execute(self, raise_errors=True):
+        # with raise_errors False, failed calls come back as Exception objects in their slot
+        if not self.calls:
+            return []
+        results = self.__send(raise_errors)
+        decoded = []
+        for (_, _, decode), result in zip(self.calls, results):
+            if decode is not None and result is not None and not isinstance(result, Exception):
+                result = decode(result)
+            decoded.append(result)
+        self.calls = []
+        return decoded
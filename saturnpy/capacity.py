@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# Trade capacity of many orders at once: the nearest valid trade of a requested amount (the rules of
+# verifyCapacity), the wei on the ether side of that trade and the effective price, for whole order books.
+# Everything is int arithmetic over parallel lists, uint256 amounts do not fit numpy integer arrays.
+
+from fractions import Fraction
+
+from .fixed import nearestTrade
+
+def buyTokenAmount(amount, price_mul, price_div, fee_mul, fee_div):
+    # wei a taker sends for amount subtokens of an order that sells tokens for ether, fee included,
+    # rounded up like the exchange contract's getBuyTokenAmount
+    feediff = fee_div - fee_mul
+    wei = amount * price_div * fee_div // price_mul // feediff
+    if wei * price_mul * feediff // price_div // fee_div < amount:
+        wei += 1
+    return wei
+
+class Capacities(object):
+    # parallel lists, index i is orders[i] of ExchangeInterface.capacities
+    __slots__ = ("order_ids", "types", "requested", "amounts", "wei")
+
+    def __init__(self, order_ids, types, requested, amounts, wei):
+        self.order_ids = order_ids
+        self.types = types
+        self.requested = requested
+        self.amounts = amounts # nearest valid trade in subtokens, 0 if the order cannot trade
+        self.wei = wei         # SELL orders: wei to send, fee included. BUY orders: wei the order pays, before fees
+
+    def __len__(self):
+        return len(self.order_ids)
+
+    def price(self, i):
+        # effective wei per subtoken, None for orders that cannot trade
+        if self.amounts[i] == 0:
+            return None
+        return Fraction(self.wei[i], self.amounts[i])
+
+    @property
+    def prices(self):
+        return [self.price(i) for i in range(len(self))]
+
+    def tradable(self):
+        return [i for i, amount in enumerate(self.amounts) if amount > 0]
+
+    def best(self):
+        # indexes of the tradable orders, cheapest SELL and best paying BUY orders first
+        return sorted(self.tradable(), key=lambda i: self.price(i) if self.types[i] == "SELL" else -self.price(i))
+
+def capacities(order_ids, types, requested, muls, divs, remaining, fee_mul=0, fee_div=1):
+    # fee_mul and fee_div are one value for all orders, or one per order when they are on several exchange contracts
+    if not isinstance(fee_mul, (list, tuple)):
+        fee_mul = [fee_mul] * len(order_ids)
+    if not isinstance(fee_div, (list, tuple)):
+        fee_div = [fee_div] * len(order_ids)
+    amounts = []
+    wei = []
+    for order_type, amount, mul, div, balance, fmul, fdiv in zip(types, requested, muls, divs, remaining, fee_mul, fee_div):
+        trade = max(nearestTrade(amount, order_type, mul, div, balance), 0)
+        amounts.append(trade)
+        if trade == 0:
+            wei.append(0)
+        elif order_type == "SELL":
+            wei.append(buyTokenAmount(trade, mul, div, fmul, fdiv))
+        else:
+            wei.append(trade * mul // div)
+    return Capacities(list(order_ids), list(types), list(requested), amounts, wei)
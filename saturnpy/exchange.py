@@ -6,34 +6,60 @@
 
 from fractions import Fraction
 import pprint
-import os
-import json
-import requests
 
 from web3 import Web3
-from .utils import toSbtkn, intVerify, exp_ether_decimals, etheraddress, gaslimit, AbiDecoder, toUint
-
-ABSOLUTEPATH = os.path.abspath(os.path.dirname(__file__))
-with open(os.path.join(ABSOLUTEPATH, "erc20.json")) as x:
-    ERC20 = json.load(x)
-
-with open(os.path.join(ABSOLUTEPATH, "erc223.json")) as x:
-    ERC223 = json.load(x)
-
-with open(os.path.join(ABSOLUTEPATH, "exchangeConfig.json")) as x:
-    EXCHANGECONFIG = json.load(x)
+from .utils import exp_ether_decimals, etheraddress, gaslimit, AbiDecoder, toUint, checksum
+from .fixed import toSbtkn, intVerify, nearestTrade, scaledPrice, truncate
+from .indexer import EventIndexer
+from .token_registry import TokenRegistry
+from .nonce_manager import NonceManager
+from .batch import RpcBatch
+from .gas_oracle import createGasOracle
+from .tx_batch import TxBatch
+from .router import planSweep, MarketTrade
+from .orderbook import bookOrders
+from .records import Order, asOrder
+from .capacity import capacities, buyTokenAmount
+from .order_registry import OrderRegistry
+from .tx_pipeline import TxPipeline, ContractCall
+from .abis import abi, calls, exchangeConfig
+
+def __getattr__(name):
+    # the abis used to be module constants, they are now loaded on first use by saturnpy.abis
+    if name == "EXCHANGECONFIG":
+        return exchangeConfig()
+    if name in ("ERC20", "ERC223"):
+        return abi(name.lower())
+    raise AttributeError(f"module 'saturnpy.exchange' has no attribute '{name}'")
 
 class ExchangeInterface(object):
-    def __init__(self, provider, wallet, query, blockchain, TESTMODE, SBTKN, STRICT, BNDL, DEBUG):
+    def __init__(self, provider, wallet, query, blockchain, TESTMODE, SBTKN, STRICT, BNDL, DEBUG, tokens=None, gas=None, pipeline=None,
+                 orders=None):
         self.query = query
         self.TESTMODE: bool = TESTMODE
         self.provider: Web3 = provider
         self.wallet = wallet
         self.blockchain = blockchain.lower()
         self.networkId = self.getNetworkId(blockchain)
-        self.exchange_contract_address = self.provider.toChecksumAddress(EXCHANGECONFIG["address"][self.blockchain.upper()])
-        self.decoder = AbiDecoder(self.provider, EXCHANGECONFIG["abi"])
+        self.exchange_contract_address = checksum(exchangeConfig()["address"][self.blockchain.upper()])
+        self._decoder = None
+        self.contracts = {} # (address, abi kind) -> web3 contract
+        self.fees = {}      # exchange contract -> (feeMul, feeDiv)
         self.SBTKN, self.STRICT, self.BNDL, self.DEBUG = SBTKN, STRICT, BNDL, DEBUG
+        if tokens is None:
+            tokens = TokenRegistry(self.provider, self.blockchain)
+        self.tokens = tokens
+        self.nonces = NonceManager(self.provider, self.wallet.address)
+        if gas is None:
+            gas = createGasOracle(self.provider, self.blockchain, self.query.session, self.query.timeout)
+        self.gas = gas
+        self.gas_oracles = {self.blockchain.upper(): gas}
+        if pipeline is None:
+            pipeline = TxPipeline(self.provider, self.wallet, self.query.session, self.query.timeout)
+        self.pipeline = pipeline
+        if orders is None:
+            orders = OrderRegistry(self.blockchain)
+        self.orders = orders # order id -> price, owner and tokens, fixed when the order is created
 
     def getNetworkId(self, blockchain = None):
         if blockchain is None:
@@ -56,32 +82,40 @@ class ExchangeInterface(object):
         else:
             blockchain = blockchain.upper()
 
-        if blockchain == 'ETC':
-            return self.provider.toWei('0.001', 'gwei')
-        if blockchain == 'ETH':
-            req = requests.get('https://www.ethgasstationapi.com/api/standard')
-            return self.provider.toWei(str(req.json()), 'gwei')
-        raise Exception(f'Unknown blockchain {blockchain}')
+        oracle = self.gas_oracles.get(blockchain)
+        if oracle is None:
+            oracle = createGasOracle(self.provider, blockchain, self.query.session, self.query.timeout)
+            self.gas_oracles[blockchain] = oracle
+        return oracle.price()
+
+    @property
+    def decoder(self):
+        # built on first use, it indexes every event of the exchange abi
+        if self._decoder is None:
+            self._decoder = AbiDecoder(self.provider, abi("exchange"))
+        return self._decoder
+
+    def contract(self, address, kind="exchange"):
+        # web3 contract instances are built once per address and abi kind, building one parses the whole abi
+        address = checksum(address)
+        key = (address, kind)
+        contract = self.contracts.get(key)
+        if contract is None:
+            contract = self.provider.eth.contract(address=address, abi=abi(kind))
+            self.contracts[key] = contract
+        return contract
+
+    def eventIndexer(self, from_block=0, **kwargs):
+        return EventIndexer(self.provider, self.exchange_contract_address, abi("exchange"), from_block, **kwargs)
 
     def isERC223(self, address):
-        address = self.provider.toChecksumAddress(address)
-        code = self.provider.eth.getCode(address)
-        return bool(str(code.hex())[2:].find("be45fd62") > -1)
+        return self.tokens.isERC223(address)
 
     def isERC20(self, address):
-        address = self.provider.toChecksumAddress(address)
-        code = self.provider.eth.getCode(address)
-        return bool(str(code.hex())[2:].find("095ea7b3") > -1)
+        return self.tokens.isERC20(address)
 
     def determineTokenType(self, address):
-        address = self.provider.toChecksumAddress(address)
-        is223 = self.isERC223(address)
-        is20 = self.isERC20(address)
-        if is223 == True:
-            return "ERC223"
-        if is20 == True:
-            return "ERC20"
-        raise Exception(f'Token {address} on ${self.blockchain.upper()} is of unknown type')
+        return self.tokens.tokenType(address)
 
     def verifyOrderType(self, order_type):
         types = ["buy", "sell"]
@@ -89,80 +123,120 @@ class ExchangeInterface(object):
             raise Exception(f'Unknown order type {order_type}')
 
     def verifyOrderTradable(self, order):
-        trader = self.wallet.address
-        orderaddr = order["owner"].lower()
-        if orderaddr == trader:
+        order = asOrder(order)
+        trader = checksum(self.wallet.address)
+        if order.owner == trader:
             raise Exception('Cannot trade against your own order!')
 
-        if bool(order["active"]) == False:
-            raise Exception(f'The order {str(order["transaction"])} appears to no longer be active')
+        if order.active == False:
+            raise Exception(f'The order {str(order.tx)} appears to no longer be active')
 
         return True
 
-    def verifyAllowance(self, token_address, amount, address):
-        token_address = self.provider.toChecksumAddress(token_address)
-        address = self.provider.toChecksumAddress(address)
-        trader = self.provider.toChecksumAddress(self.wallet.address)
-        token = self.provider.eth.contract(address=token_address, abi=ERC20)
-
+    def verifyAllowance(self, token_address, amount, address, allowance=None):
+        token_address = checksum(token_address)
         if address is None:
             address = self.exchange_contract_address
+        address = checksum(address)
+        trader = checksum(self.wallet.address)
 
-        allowance = token.functions.allowance(trader, address).call()
+        if allowance is None:
+            token = self.contract(token_address, "erc20")
+            allowance = token.functions.allowance(trader, address).call()
 
         if allowance < amount:
             raise Exception(f'Insufficient allowance for token {token_address}. Please visit https://forum.saturn.network/t/saturnjs-insufficient-allowance-error/2966 to resolve')
 
         return True
 
-    def verifyEtherBalance(self, amount):
-        trader = self.wallet.address
-        balance = int(self.provider.eth.getBalance(trader))
+    def verifyEtherBalance(self, amount, balance=None):
+        if balance is None:
+            trader = self.wallet.address
+            balance = int(self.provider.eth.getBalance(trader))
 
         if amount > balance:
             raise Exception(f'Insufficient wei balance. Requested amount: {amount}. Available amount: {balance}')
         return True
 
-    def verifyTokenBalance(self, token_address, amount):
+    def verifyTokenBalance(self, token_address, amount, balance=None):
         trader = self.wallet.address
-        contract_addr = self.provider.toChecksumAddress(token_address)
-        token = self.provider.eth.contract(address=contract_addr, abi=ERC20)
+        contract_addr = checksum(token_address)
 
-        balance = int(token.functions.balanceOf(trader).call())
+        if balance is None:
+            token = self.contract(contract_addr, "erc20")
+            balance = int(token.functions.balanceOf(trader).call())
         if amount > balance:
             raise Exception(f'Insufficient balance for token {contract_addr}. Requested amount: {amount}. Available amount: {balance}')
         return True
 
-    def verifyCapacity(self, amount, order):
-        order_id = int(order["order_id"])
-        order_contract = self.provider.toChecksumAddress(order["contract"]) # self.exchange_contract_address  #
-        token_addr = ""
-        if order["buytoken"]["address"] != etheraddress:
-            token_addr = order["buytoken"]["address"]
-        if order["selltoken"]["address"] != etheraddress:
-            token_addr = order["selltoken"]["address"]
-        token_addr = self.provider.toChecksumAddress(token_addr)
-        token = self.provider.eth.contract(address=token_addr, abi=ERC20)
-        exchange = self.provider.eth.contract(address=order_contract, abi=EXCHANGECONFIG["abi"])
+    def orderToken(self, order):
+        return asOrder(order).token
+
+    def preTradeState(self, order, token_balance=False, allowance=False, ether_balance=False):
+        # everything verifyCapacity and the balance / allowance checks read from the chain, in one batched rpc request
+        order = asOrder(order)
+        order_id = order.order_id
+        order_contract = order.contract
+        trader = checksum(self.wallet.address)
+        token_addr = order.token
+        token = self.contract(token_addr, "erc20")
+
+        # the receipt is only needed for the price of an order that is not in the registry yet
+        terms = self.orders.get(order_contract, order_id)
+        batch = RpcBatch(self.provider, self.query.session, self.query.timeout)
+        keys = []
+        if terms is None:
+            keys.append("receipt")
+            batch.getTransactionReceipt(order.tx)
+        keys.append("remaining")
+        batch.call(order_contract, calls("exchange").encode("remainingAmount", order_id))
+        if token_balance:
+            keys.append("tokenBalance")
+            batch.contractCall(token, "balanceOf", [trader])
+        if allowance:
+            keys.append("allowance")
+            batch.contractCall(token, "allowance", [trader, order_contract])
+        if ether_balance:
+            keys.append("etherBalance")
+            batch.getBalance(trader)
+
+        state = dict(zip(keys, batch.execute()))
+        if terms is None:
+            receipt = state.pop("receipt")
+            if receipt is None:
+                raise Exception(f'No receipt for order tx {order.tx}')
+            self.orders.addEvents(self.decoder.decodeLogs(receipt["logs"]))
+            terms = self.orders.get(order_contract, order_id)
+            if terms is None:
+                raise Exception(f'No NewOrder event for order {order_id} in tx {order.tx}')
+        state["price"] = terms.price
+        return state
+
+    def verifyCapacity(self, amount, order, state=None):
+        order = asOrder(order)
+        order_id = order.order_id
+        token_addr = order.token
 
         if not self.SBTKN:
-            exp_decimals = 10 ** int(token.functions.decimals().call())
+            exp_decimals = self.tokens.expDecimals(token_addr)
             amount = toSbtkn(amount, exp_decimals, self.STRICT)
-
-        amount = intVerify(amount)
-
-        price_obj = self.decoder.getIntegerPrice(order["transaction"])
-        price_mul = int(price_obj["mul"])
-        price_div = int(price_obj["div"])
-
-        order_balance = int(exchange.functions.remainingAmount(order_id).call())
-
-        if order["type"] == "BUY":
-            nearest_trade = min(amount - amount % price_div, order_balance * price_div // price_mul)
-        elif order["type"] == "SELL":
-            nearest_trade = min(amount - amount % price_mul, order_balance)
         else:
-            raise Exception(f'Unknown order type for order_tx {order["transaction"]} on ${self.blockchain}')
+            amount = intVerify(amount)
+
+        if state is None:
+            order_balance = self.remainingAmounts([order])[0]
+            price = self.orders.price(order.contract, order_id)
+            if price is None:
+                raise Exception(f'No receipt for order tx {order.tx}')
+            price_mul, price_div = price
+        else:
+            price_mul = int(state["price"]["mul"])
+            price_div = int(state["price"]["div"])
+            order_balance = int(state["remaining"])
+
+        if order.type not in ("BUY", "SELL"):
+            raise Exception(f'Unknown order type for order_tx {order.tx} on ${self.blockchain}')
+        nearest_trade = nearestTrade(amount, order.type, price_mul, price_div, order_balance)
 
         if self.STRICT:
             if amount != nearest_trade:
@@ -173,18 +247,122 @@ class ExchangeInterface(object):
 
         return nearest_trade
 
-    def sendRawTx(self, unsigned_tx):
+    def orderPrices(self, orders):
+        # (priceMul, priceDiv) per order, None if the order tx has no receipt
+        orders = [asOrder(order) for order in orders]
+        self.remainingAmounts(orders, remaining=False)
+        return [self.orders.price(order.contract, order.order_id) for order in orders]
+
+    def remainingAmounts(self, orders, remaining=True):
+        # remainingAmount of every order in one batch, with the receipts of orders whose price is not cached yet.
+        # Prices never change, an order's receipt is only fetched the first time it is seen.
+        orders = [asOrder(order) for order in orders]
+        unpriced = {(order.contract, order.order_id): order.tx for order in orders if (order.contract, order.order_id) not in self.orders}
+        batch = RpcBatch(self.provider, self.query.session, self.query.timeout)
+        for tx in unpriced.values():
+            batch.getTransactionReceipt(tx)
+        if remaining:
+            encode = calls("exchange").encode
+            for order in orders:
+                batch.call(checksum(order.contract), encode("remainingAmount", order.order_id))
+        results = batch.execute()
+        events = []
+        for receipt in results[:len(unpriced)]:
+            if receipt is not None:
+                events += self.decoder.decodeLogs(receipt["logs"])
+        self.orders.addEvents(events)
+        return [int(r) for r in results[len(unpriced):]]
+
+    def syncOrders(self, from_block=0, to_block=None):
+        # loads the terms of every order from the NewOrder logs, later calls continue where the last one stopped
+        return self.orders.sync(self.eventIndexer(from_block, events=("NewOrder",)), to_block)
+
+    def exchangeFees(self, contract=None):
+        # (feeMul, feeDiv) of an exchange contract, read once
+        contract = checksum(contract or self.exchange_contract_address)
+        fees = self.fees.get(contract)
+        if fees is None:
+            batch = RpcBatch(self.provider, self.query.session, self.query.timeout)
+            batch.contractCall(self.contract(contract), "feeMul", [])
+            batch.contractCall(self.contract(contract), "feeDiv", [])
+            fees = self.fees[contract] = tuple(int(fee) for fee in batch.execute())
+        return fees
+
+    def capacities(self, orders, amounts, remaining=None):
+        # nearest valid trade, wei and effective price of trading amounts (one per order, or one for all)
+        # against many orders. Remaining amounts are read in one batch unless given, fees once per exchange contract.
+        orders = [asOrder(order) for order in orders]
+        if not isinstance(amounts, (list, tuple)):
+            amounts = [amounts] * len(orders)
+        requested = []
+        for order, amount in zip(orders, amounts):
+            if not self.SBTKN:
+                amount = toSbtkn(amount, self.tokens.expDecimals(order.token), self.STRICT)
+            requested.append(intVerify(amount))
+
+        if remaining is None:
+            remaining = self.remainingAmounts(orders)
+        prices = [self.orders.price(order.contract, order.order_id) for order in orders]
+        if None in prices:
+            prices = self.orderPrices(orders)
+        for order, price in zip(orders, prices):
+            if price is None:
+                raise Exception(f'No receipt for order tx {order.tx}')
+        fees = {contract: self.exchangeFees(contract) for contract in set(order.contract for order in orders)}
+        return capacities(
+            [order.order_id for order in orders], [order.type for order in orders], requested,
+            [mul for mul, _ in prices], [div for _, div in prices], [int(r) for r in remaining],
+            [fees[order.contract][0] for order in orders], [fees[order.contract][1] for order in orders]
+        )
+
+    def getNonce(self, custom_nonce=None):
+        if custom_nonce is None:
+            return self.nonces.next()
+        return custom_nonce
+
+    def buildTx(self, contract_function, custom_nonce=None, value=None):
+        # contract_function is a ContractCall from the calldata templates or a web3 ContractFunction
+        tx = {
+            'chainId': self.networkId,
+            'gasPrice': self.getGasPrice(),
+            'gas': gaslimit
+        }
+        if value is not None:
+            tx['value'] = value
+        # nonce is taken last, once nothing else can fail before the transaction is built
+        tx['nonce'] = self.getNonce(custom_nonce)
+        try:
+            if isinstance(contract_function, ContractCall):
+                tx['to'] = contract_function.to
+                tx['data'] = contract_function.data
+                tx.setdefault('value', 0)
+                return tx
+            return contract_function.buildTransaction(tx)
+        except:
+            if custom_nonce is None:
+                self.nonces.release(tx['nonce'])
+            raise
+
+    def sendRawTx(self, unsigned_tx, custom_nonce=None):
         if self.TESTMODE == True:
             self.log(unsigned_tx)
             return '0x'
 
         try:
-            signed_tx = self.wallet.signTransaction(unsigned_tx)
-            self.provider.eth.sendRawTransaction(signed_tx.rawTransaction)
-            txhash = self.provider.toHex(self.provider.sha3(signed_tx.rawTransaction))
-            return txhash
-        except:
-            raise Exception('ERROR SENDING RAW TRANSACTION')
+            future = self.pipeline.submit([unsigned_tx], self.wallet)[0]
+        except Exception as e:
+            # signing failed, the node never saw the transaction
+            if custom_nonce is None:
+                self.nonces.release(unsigned_tx["nonce"])
+            raise Exception(f'ERROR SIGNING RAW TRANSACTION: {e}') from e
+
+        try:
+            return future.result()
+        except Exception as e:
+            # rejected by the node (nonce too low, known transaction, ...) or lost on the way after the request may
+            # have reached it, either way the local count can't be trusted and is read again from the pending count
+            self.nonces.reset()
+            raise Exception(f'ERROR SENDING RAW TRANSACTION: {e}') from e
 
     def createERC223OrderPayload(self, price_mul, price_div, buytoken):
         padded_token = buytoken
@@ -196,111 +374,98 @@ class ExchangeInterface(object):
 
 # TRADING FUNCTIONS
 
+    def tradeCall(self, order, token_address, token_type, amount, wei_amount=None):
+        # contract function and ether value that trade amount against order, after verifyCapacity
+        order = asOrder(order)
+        order_id = order.order_id
+        ex_contract = order.contract
+        if order.type == "SELL":
+            return calls("exchange").call(ex_contract, "buyOrderWithEth", order_id), int(wei_amount)
+        if token_type == "ERC223":
+            payload = "0x" + toUint(order_id)
+            return calls("erc223").call(
+                token_address, "transfer",
+                ex_contract,
+                amount,
+                payload
+            ), None
+        return calls("exchange").call(
+            ex_contract, "buyOrderWithERC20Token",
+            order_id,
+            token_address,
+            amount
+        ), None
+
     def newERC223Trade(self, token_address, amount, order, custom_nonce=None):
+        order = asOrder(order)
         self.verifyOrderTradable(order)
 
-        amount = self.verifyCapacity(amount, order)
+        state = self.preTradeState(order, token_balance=True)
+        amount = self.verifyCapacity(amount, order, state)
 
         self.log(f"newERC223Trade, amount = {amount}")
 
-        token_address = self.provider.toChecksumAddress(token_address)
-        self.verifyTokenBalance(token_address, amount)
-
-        token = self.provider.eth.contract(address=token_address, abi=ERC223)
+        token_address = checksum(token_address)
+        self.verifyTokenBalance(token_address, amount, state["tokenBalance"])
 
-        payload = "0x" + toUint(int(order["order_id"]))
-        ex_contract = self.provider.toChecksumAddress(order["contract"])
+        function, _ = self.tradeCall(order, token_address, "ERC223", amount)
+        unsigned_tx = self.buildTx(function, custom_nonce)
 
-        if custom_nonce is None:
-            nonce = self.provider.eth.getTransactionCount(self.wallet.address)
-        else:
-            nonce = custom_nonce
-
-        unsigned_tx = token.functions.transfer(
-            ex_contract,
-            amount,
-            payload
-        ).buildTransaction({
-            'chainId': self.networkId,
-            'gasPrice': self.getGasPrice(),
-            'gas': gaslimit,
-            'nonce': nonce
-        })
-
-        txhash = self.sendRawTx(unsigned_tx)
+        txhash = self.sendRawTx(unsigned_tx, custom_nonce)
         return txhash
 
     def newERC20Trade(self, token_address, amount, order, custom_nonce=None):
+        order = asOrder(order)
         self.verifyOrderTradable(order)
-        amount = self.verifyCapacity(amount, order)
+        state = self.preTradeState(order, token_balance=True, allowance=True)
+        amount = self.verifyCapacity(amount, order, state)
 
-        token_address = self.provider.toChecksumAddress(token_address)
-        self.verifyTokenBalance(token_address, amount)
+        token_address = checksum(token_address)
+        self.verifyTokenBalance(token_address, amount, state["tokenBalance"])
 
-        ex_contract = self.provider.toChecksumAddress(order["contract"])
-        exchange = self.provider.eth.contract(address=ex_contract, abi=EXCHANGECONFIG["abi"])
-        self.verifyAllowance(token_address, amount, ex_contract)
+        self.verifyAllowance(token_address, amount, order.contract, state["allowance"])
 
-        if custom_nonce is None:
-            nonce = self.provider.eth.getTransactionCount(self.wallet.address)
-        else:
-            nonce = custom_nonce
+        function, _ = self.tradeCall(order, token_address, "ERC20", amount)
+        unsigned_tx = self.buildTx(function, custom_nonce)
 
-        unsigned_tx = exchange.functions.buyOrderWithERC20Token(
-            int(order["order_id"]),
-            token_address,
-            amount
-        ).buildTransaction({
-            'chainId': self.networkId,
-            'gasPrice': self.getGasPrice(),
-            'gas': gaslimit,
-            'nonce': nonce
-        })
-
-        txhash = self.sendRawTx(unsigned_tx)
+        txhash = self.sendRawTx(unsigned_tx, custom_nonce)
         return txhash
 
     def newEtherTrade(self, amount, order, custom_nonce=None):
+        order = asOrder(order)
         self.verifyOrderTradable(order)
 
-        amount = self.verifyCapacity(amount, order)
+        state = self.preTradeState(order, ether_balance=True)
+        amount = self.verifyCapacity(amount, order, state)
         self.log(f"newEtherTrade, amount = {amount}")
 
-        ex_contract = self.provider.toChecksumAddress(order["contract"])
-        exchange = self.provider.eth.contract(address=ex_contract, abi=EXCHANGECONFIG["abi"])
-        required_ether_amount = exchange.functions.getBuyTokenAmount(
-            amount, int(order["order_id"])
-        ).call()
+        # the contract's getBuyTokenAmount, from the price read before and the cached fees instead of another eth_call
+        fee_mul, fee_div = self.exchangeFees(order.contract)
+        required_ether_amount = buyTokenAmount(
+            amount, int(state["price"]["mul"]), int(state["price"]["div"]), fee_mul, fee_div
+        )
 
         self.log(f"newEtherTrade, requiredEtherAmount = {required_ether_amount}")
 
-        self.verifyEtherBalance(required_ether_amount)
+        self.verifyEtherBalance(required_ether_amount, state["etherBalance"])
 
-        if custom_nonce is None:
-            nonce = self.provider.eth.getTransactionCount(self.wallet.address)
-        else:
-            nonce = custom_nonce
-
-        unsigned_tx = exchange.functions.buyOrderWithEth(
-            int(order["order_id"])
-        ).buildTransaction({
-            'chainId': self.networkId,
-            'gasPrice': self.getGasPrice(),
-            'gas': gaslimit,
-            'nonce': nonce,
-            'value': required_ether_amount
-        })
+        function, value = self.tradeCall(order, None, None, amount, required_ether_amount)
+        unsigned_tx = self.buildTx(function, custom_nonce, value)
 
-        txhash = self.sendRawTx(unsigned_tx)
+        txhash = self.sendRawTx(unsigned_tx, custom_nonce)
         return txhash
 
     def newTrade(self, amount, orderTx, custom_nonce=None):
-        order = self.query.awaitOrderTx(orderTx)
-        order_type = order["type"].lower()
+        # an order tx whose NewOrder event is in the registry is mined, no need to wait for its receipt
+        if self.orders.orderIdForTx(orderTx) is not None:
+            order = asOrder(self.query.getOrderByTx(orderTx))
+        else:
+            order = asOrder(self.query.awaitOrderTx(orderTx))
+        order_type = order.type.lower()
         if order_type == "sell":
             return self.newEtherTrade(amount, order, custom_nonce)
         elif order_type == "buy":
-            token_address = self.provider.toChecksumAddress(order["buytoken"]["address"])
+            token_address = order.buy_token
             token_type = self.determineTokenType(token_address)
             if token_type == "ERC223":
                 return self.newERC223Trade(token_address, amount, order, custom_nonce)
@@ -313,34 +478,34 @@ class ExchangeInterface(object):
         if contract is None:
             contract = self.exchange_contract_address
 
-        contract_addr = self.provider.toChecksumAddress(contract)
-        exchange = self.provider.eth.contract(address=contract_addr, abi=EXCHANGECONFIG["abi"])
-
-        if custom_nonce is None:
-            nonce = self.provider.eth.getTransactionCount(self.wallet.address)
-        else:
-            nonce = custom_nonce
+        contract_addr = checksum(contract)
 
-        unsigned_tx = exchange.functions.cancelOrder(order_id).buildTransaction({
-            'chainId': self.networkId,
-            'gasPrice': self.getGasPrice(),
-            'gas': gaslimit,
-            'nonce': nonce
-        })
+        unsigned_tx = self.buildTx(calls("exchange").call(contract_addr, "cancelOrder", int(order_id)), custom_nonce)
 
-        txhash = self.sendRawTx(unsigned_tx)
+        txhash = self.sendRawTx(unsigned_tx, custom_nonce)
+        self.__forgetOrders([order_id], contract_addr)
         return txhash
 
+    def __forgetOrders(self, order_ids, contract):
+        # drops the cached ticker json of cancelled orders, so they are not read back as active
+        for order_id in order_ids:
+            terms = self.orders.get(contract, order_id)
+            if terms is None or terms.tx is None:
+                self.query.invalidate("getOrderByTx")
+                return
+            self.query.invalidate("getOrderByTx", terms.tx)
+
     def cancelOrderByTxHash(self, txhash : str):
         order = self.query.getOrderByTx(txhash.lower())
         order_id = int(order["order_id"])
         cancel_hash = self.cancelOrder(order_id)
         self.log(f'CANCELING ORDERID {order_id} (ORDERHASH: {txhash}), CANCEL HASH: {cancel_hash}')
-        wait = self.provider.eth.waitForTransactionReceipt(cancel_hash, timeout=120)
+        wait = self.query.watcher.wait(cancel_hash, 120)
+        self.query.invalidate("getOrderByTx", txhash.lower())
         return wait
 
     def newOrder(self, token_address, order_type, amount, price, custom_nonce=None):
-        token_address = self.provider.toChecksumAddress(token_address)
+        token_address = checksum(token_address)
 
         self.verifyOrderType(order_type.lower())
         token_type = self.determineTokenType(token_address)
@@ -366,135 +531,269 @@ class ExchangeInterface(object):
         else:
             raise Exception(f'UNKNOWN ORDERTYPE {order_type}')
 
-    def newBuyOrder(self, token_address, amount, price, order_contract, custom_nonce):
-        amount = Fraction(amount)
-        price = Fraction(price)
-
-        token_address = self.provider.toChecksumAddress(token_address)
-        ex_contract = self.provider.toChecksumAddress(order_contract)
-        exchange = self.provider.eth.contract(address=ex_contract, abi=EXCHANGECONFIG["abi"])
-
+    def orderAmounts(self, token_address, amount, price):
+        # integer subtoken amount, wei per subtoken price and wei amount of a new order
         if not self.SBTKN:
-            token = self.provider.eth.contract(address=token_address, abi=ERC20)
-            exp_decimals = 10 ** int(token.functions.decimals().call())
-            amount = amount * exp_decimals
-            price = price * exp_ether_decimals / exp_decimals
+            exp_decimals = self.tokens.expDecimals(token_address)
+            amount = toSbtkn(amount, exp_decimals, self.STRICT)
+            price_mul, price_div = scaledPrice(price, exp_ether_decimals, exp_decimals)
+        else:
+            amount = intVerify(amount, self.STRICT)
+            price_mul, price_div = scaledPrice(price)
 
-        amount = intVerify(amount, self.STRICT)
-        wei_amount = intVerify(amount * price, self.STRICT)
+        wei_amount = truncate(amount * price_mul, price_div, self.STRICT)
 
         if not self.BNDL:
-            if price.denominator != 1:
+            if price_div != 1:
                 raise Exception(f'Price is a Fraction. Bundle Pricing is not allowed.')
 
-        self.verifyEtherBalance(wei_amount)
+        return amount, Fraction(price_mul, price_div), wei_amount
 
-        if custom_nonce is None:
-            nonce = self.provider.eth.getTransactionCount(self.wallet.address)
-        else:
-            nonce = custom_nonce
+    def orderCall(self, token_address, token_type, order_type, amount, price, wei_amount, order_contract):
+        # contract function and ether value that create an order from normalised orderAmounts
+        if order_type == 'buy':
+            return calls("exchange").call(
+                order_contract, "sellEther",
+                token_address,
+                price.numerator,
+                price.denominator
+            ), int(wei_amount)
+        if token_type == 'ERC223':
+            payload = self.createERC223OrderPayload(price.denominator, price.numerator, etheraddress)
+            return calls("erc223").call(
+                token_address, "transfer",
+                order_contract,
+                amount,
+                payload
+            ), None
+        if token_type == 'ERC20':
+            return calls("exchange").call(
+                order_contract, "sellERC20Token",
+                token_address,
+                etheraddress,
+                amount,
+                price.denominator,
+                price.numerator
+            ), None
+        raise Exception('UNKNOWN TOKEN STANDARD')
 
-        unsigned_tx = exchange.functions.sellEther(
-            token_address,
-            price.numerator,
-            price.denominator
-        ).buildTransaction({
-            'chainId': self.networkId,
-            'gasPrice': self.getGasPrice(),
-            'gas': gaslimit,
-            'nonce': nonce,
-            'value': int(wei_amount)
-        })
+    def newBuyOrder(self, token_address, amount, price, order_contract, custom_nonce):
+        token_address = checksum(token_address)
+        ex_contract = checksum(order_contract)
 
-        txhash = self.sendRawTx(unsigned_tx)
-        return txhash
+        amount, price, wei_amount = self.orderAmounts(token_address, amount, price)
 
-    def newERC223sellOrder(self, token_address, amount, price, order_contract, custom_nonce=None):
-        amount = Fraction(amount)
-        price = Fraction(price)
+        self.verifyEtherBalance(wei_amount)
 
-        token_address = self.provider.toChecksumAddress(token_address)
-        order_contract = self.provider.toChecksumAddress(order_contract)
-        token = self.provider.eth.contract(address=token_address, abi=ERC223)
+        function, value = self.orderCall(token_address, None, "buy", amount, price, wei_amount, ex_contract)
+        unsigned_tx = self.buildTx(function, custom_nonce, value)
 
-        if not self.SBTKN:
-            exp_decimals = 10 ** int(token.functions.decimals().call())
-            amount = toSbtkn(amount, exp_decimals, self.STRICT)
-            price = price * exp_ether_decimals / exp_decimals
+        txhash = self.sendRawTx(unsigned_tx, custom_nonce)
+        return txhash
 
-        amount = intVerify(amount, self.STRICT)
-        intVerify(amount * price, self.STRICT)
+    def newERC223sellOrder(self, token_address, amount, price, order_contract, custom_nonce=None):
+        token_address = checksum(token_address)
+        order_contract = checksum(order_contract)
 
-        if not self.BNDL:
-            if price.denominator != 1:
-                raise Exception(f'Price is a Fraction. Bundle Pricing is not allowed.')
+        amount, price, _ = self.orderAmounts(token_address, amount, price)
 
         self.verifyTokenBalance(token_address, amount)
 
-        if custom_nonce is None:
-            nonce = self.provider.eth.getTransactionCount(self.wallet.address)
-        else:
-            nonce = custom_nonce
+        function, _ = self.orderCall(token_address, "ERC223", "sell", amount, price, None, order_contract)
+        unsigned_tx = self.buildTx(function, custom_nonce)
 
-        payload = self.createERC223OrderPayload(price.denominator, price.numerator, etheraddress)
-
-        unsigned_tx = token.functions.transfer(
-            order_contract,
-            amount,
-            payload
-        ).buildTransaction({
-            'chainId': self.networkId,
-            'gasPrice': self.getGasPrice(),
-            'gas': gaslimit,
-            'nonce': nonce
-        })
-
-        txhash = self.sendRawTx(unsigned_tx)
+        txhash = self.sendRawTx(unsigned_tx, custom_nonce)
         return txhash
 
     def newERC20sellOrder(self, token_address, amount, price, order_contract, custom_nonce=None):
-        amount = Fraction(amount)
-        price = Fraction(price)
+        token_address = checksum(token_address)
+        order_contract = checksum(order_contract)
 
-        token_address = self.provider.toChecksumAddress(token_address)
-        order_contract = self.provider.toChecksumAddress(order_contract)
-        token = self.provider.eth.contract(address=token_address, abi=ERC20)
+        amount, price, _ = self.orderAmounts(token_address, amount, price)
 
-        if not self.SBTKN:
-            exp_decimals = 10 ** int(token.functions.decimals().call())
-            amount = toSbtkn(amount, exp_decimals, self.STRICT)
-            price = price * exp_ether_decimals / exp_decimals
+        self.verifyTokenBalance(token_address, amount)
 
-        amount = intVerify(amount, self.STRICT)
-        intVerify(amount * price, self.STRICT)
+        self.verifyAllowance(token_address, amount, order_contract)
 
-        if not self.BNDL:
-            if price.denominator != 1:
-                raise Exception(f'Price is a Fraction. Bundle Pricing is not allowed.')
+        function, _ = self.orderCall(token_address, "ERC20", "sell", amount, price, None, order_contract)
+        unsigned_tx = self.buildTx(function, custom_nonce)
 
-        self.verifyTokenBalance(token_address, amount)
+        txhash = self.sendRawTx(unsigned_tx, custom_nonce)
+        return txhash
 
-        if custom_nonce is None:
-            nonce = self.provider.eth.getTransactionCount(self.wallet.address)
-        else:
-            nonce = custom_nonce
+# BULK FUNCTIONS
+
+    def newOrders(self, orders, order_contract=None) -> TxBatch:
+        # orders is a list of (token_address, order_type, amount, price). Balances and allowances are checked once
+        # against the summed amounts, then all orders are signed with consecutive nonces and broadcast together.
+        if order_contract is None:
+            order_contract = self.exchange_contract_address
+        order_contract = checksum(order_contract)
+        trader = checksum(self.wallet.address)
+
+        order_calls = []
+        wei_total = 0
+        token_totals = {}
+        allowance_totals = {}
+        for token_address, order_type, amount, price in orders:
+            token_address = checksum(token_address)
+            order_type = order_type.lower()
+            self.verifyOrderType(order_type)
+            token_type = self.determineTokenType(token_address)
+            amount, price, wei_amount = self.orderAmounts(token_address, amount, price)
 
-        self.verifyAllowance(token_address, amount, order_contract)
+            if order_type == 'buy':
+                wei_total += wei_amount
+            else:
+                token_totals[token_address] = token_totals.get(token_address, 0) + amount
+                if token_type == 'ERC20':
+                    allowance_totals[token_address] = allowance_totals.get(token_address, 0) + amount
+
+            order_calls.append(self.orderCall(token_address, token_type, order_type, amount, price, wei_amount, order_contract))
+
+        batch = RpcBatch(self.provider, self.query.session, self.query.timeout)
+        checks = []
+        if wei_total > 0:
+            checks.append(("ether", None, wei_total))
+            batch.getBalance(trader)
+        for token_address, total in token_totals.items():
+            checks.append(("balance", token_address, total))
+            batch.contractCall(self.contract(token_address, "erc20"), "balanceOf", [trader])
+        for token_address, total in allowance_totals.items():
+            checks.append(("allowance", token_address, total))
+            batch.contractCall(self.contract(token_address, "erc20"), "allowance", [trader, order_contract])
+
+        for (kind, token_address, total), result in zip(checks, batch.execute()):
+            if kind == "ether":
+                self.verifyEtherBalance(total, result)
+            elif kind == "balance":
+                self.verifyTokenBalance(token_address, total, result)
+            else:
+                self.verifyAllowance(token_address, total, order_contract, result)
 
-        exchange = self.provider.eth.contract(address=order_contract, abi=EXCHANGECONFIG["abi"])
+        return self.sendRawTxs(order_calls)
 
-        unsigned_tx = exchange.functions.sellERC20Token(
-            token_address,
-            etheraddress,
-            amount,
-            price.denominator,
-            price.numerator
-        ).buildTransaction({
-            'chainId': self.networkId,
-            'gasPrice': self.getGasPrice(),
-            'gas': gaslimit,
-            'nonce': nonce
-        })
+    def cancelOrders(self, order_ids, contract=None) -> TxBatch:
+        if contract is None:
+            contract = self.exchange_contract_address
 
-        txhash = self.sendRawTx(unsigned_tx)
-        return txhash
+        contract_addr = checksum(contract)
+        batch = self.sendRawTxs([(calls("exchange").call(contract_addr, "cancelOrder", int(order_id)), None) for order_id in order_ids])
+        self.__forgetOrders(order_ids, contract_addr)
+        return batch
+
+    def sendRawTxs(self, calls) -> TxBatch:
+        # calls is a list of (ContractCall or contract_function, value). Builds all with consecutive nonces,
+        # signs them on the pipeline pool and waits until its broadcast stage has sent them
+        nonces = self.nonces.reserve(len(calls))
+        try:
+            unsigned_txs = [self.buildTx(function, nonce, value) for (function, value), nonce in zip(calls, nonces)]
+        except:
+            self.nonces.reset()
+            raise
+
+        if self.TESTMODE == True:
+            for unsigned_tx in unsigned_txs:
+                self.log(unsigned_tx)
+            return TxBatch(self.provider, self.query.watcher, ['0x'] * len(unsigned_txs))
+
+        try:
+            futures = self.pipeline.submit(unsigned_txs, self.wallet)
+        except:
+            self.nonces.reset()
+            raise
+
+        txhashes = []
+        errors = {}
+        for i, future in enumerate(futures):
+            try:
+                txhashes.append(future.result())
+            except Exception as e:
+                txhashes.append(None)
+                errors[i] = e
+        if errors:
+            self.nonces.reset()
+            self.log(f'BULK SEND FAILED FOR {len(errors)} OF {len(calls)} TRANSACTIONS')
+        return TxBatch(self.provider, self.query.watcher, txhashes, errors)
+
+    def marketTrade(self, token_address, side, amount, max_price=None, max_orders=20) -> MarketTrade:
+        # side "buy" takes sell orders (paying ether), "sell" takes buy orders (paying tokens).
+        # max_price is in ether per token, orders past it are not touched.
+        token_address = checksum(token_address)
+        side = side.lower()
+        self.verifyOrderType(side)
+        trader = checksum(self.wallet.address)
+
+        book = self.query.orderbook(token_address)
+        if side == "buy":
+            orders = sorted((Order.fromJson(o) for o in bookOrders(book, "SELL")), key=lambda o: o.price)
+            if max_price is not None:
+                limit = Fraction(max_price)
+                orders = [o for o in orders if o.price <= limit]
+        else:
+            orders = sorted((Order.fromJson(o) for o in bookOrders(book, "BUY")), key=lambda o: o.price, reverse=True)
+            if max_price is not None:
+                limit = Fraction(max_price)
+                orders = [o for o in orders if o.price >= limit]
+        orders = [o for o in orders if o.owner != trader and o.active][:max_orders]
+
+        if not self.SBTKN:
+            requested = toSbtkn(amount, self.tokens.expDecimals(token_address), self.STRICT)
+        else:
+            requested = intVerify(amount)
+
+        # remaining amount of every candidate and the receipts of orders not priced yet, one batched request
+        remaining = self.remainingAmounts(orders)
+
+        candidates = []
+        for order, balance in zip(orders, remaining):
+            price = self.orders.price(order.contract, order.order_id)
+            if price is None:
+                continue
+            candidates.append({
+                "order": order,
+                "type": order.type,
+                "mul": price[0],
+                "div": price[1],
+                "remaining": balance
+            })
+
+        legs, rest = planSweep(requested, candidates)
+        if self.STRICT and rest != 0:
+            raise Exception(f'Book cannot fill amount {requested}. nearest possible fill: {requested - rest}')
+        if not legs:
+            raise Exception(f'No order can fill {side} {requested} of {token_address}')
+        self.log(f"marketTrade, legs = {[(c['order'].order_id, leg) for c, leg in legs]}")
+
+        # verify the whole sweep at once, then submit every leg with consecutive nonces
+        batch = RpcBatch(self.provider, self.query.session, self.query.timeout)
+        trade_calls = []
+        if side == "buy":
+            for candidate, leg in legs:
+                exchange = self.contract(candidate["order"].contract)
+                batch.contractCall(exchange, "getBuyTokenAmount", [leg, candidate["order"].order_id])
+            batch.getBalance(trader)
+            results = batch.execute()
+            wei_amounts, balance = results[:-1], results[-1]
+            self.verifyEtherBalance(sum(wei_amounts), balance)
+            for (candidate, leg), wei_amount in zip(legs, wei_amounts):
+                trade_calls.append(self.tradeCall(candidate["order"], None, None, leg, wei_amount))
+        else:
+            token_type = self.determineTokenType(token_address)
+            total = sum(leg for _, leg in legs)
+            token = self.contract(token_address, "erc20")
+            batch.contractCall(token, "balanceOf", [trader])
+            contracts = sorted(set(c["order"].contract for c, _ in legs))
+            if token_type == "ERC20":
+                for contract in contracts:
+                    batch.contractCall(token, "allowance", [trader, contract])
+            results = batch.execute()
+            self.verifyTokenBalance(token_address, total, results[0])
+            if token_type == "ERC20":
+                for contract, allowance in zip(contracts, results[1:]):
+                    needed = sum(leg for c, leg in legs if c["order"].contract == contract)
+                    self.verifyAllowance(token_address, needed, contract, allowance)
+            for candidate, leg in legs:
+                trade_calls.append(self.tradeCall(candidate["order"], token_address, token_type, leg))
+
+        return MarketTrade(self.decoder, requested, legs, self.sendRawTxs(trade_calls))
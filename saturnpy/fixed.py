@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+# Exact amount and price arithmetic on plain ints. A decimal is a (coefficient, exponent) pair meaning
+# coefficient * 10 ** exponent, with the trailing zeros of the coefficient moved into the exponent, and a
+# rational is a (numerator, denominator) pair. Number strings are parsed with one int() of their digits,
+# nothing goes through a Decimal context or a chain of Fraction objects. utils re-exports the helpers
+# under their old names; tests/test_fixed.py checks them against the Decimal / Fraction versions.
+
+import re
+from math import gcd
+from decimal import Decimal
+from fractions import Fraction
+
+DECIMAL_STRING = re.compile(r"\s*([+-]?)(\d*)(?:\.(\d*))?(?:[eE]([+-]?\d+))?\s*\Z")
+POW10 = [10 ** i for i in range(80)] # covers every uint256 amount
+
+def pow10(n):
+    return POW10[n] if n < 80 else 10 ** n
+
+def splitString(value):
+    # (coefficient, exponent) of a plain or scientific decimal string, not normalised. None for anything else
+    m = DECIMAL_STRING.match(value)
+    if m is None:
+        return None
+    sign, whole, frac, exp = m.groups()
+    if not whole and not frac:
+        return None
+    frac = frac or ""
+    c = int(whole + frac)
+    return (-c if sign == "-" else c), int(exp or 0) - len(frac)
+
+def normalize(c, e):
+    # a zero keeps its exponent, mentDecimal("0.00", 1) is 0.001 like it was with Decimal
+    if c == 0:
+        return 0, e
+    if c % 10:
+        return c, e
+    s = str(c)
+    t = s.rstrip("0")
+    return int(t), e + len(s) - len(t)
+
+def ratio(value):
+    # numerator and positive denominator of an int, Fraction, Decimal, float or number string, not reduced
+    if isinstance(value, (int, Fraction)):
+        return value.numerator, value.denominator
+    if isinstance(value, str):
+        split = splitString(value)
+        if split is not None:
+            c, e = split
+            return (c * pow10(e), 1) if e >= 0 else (c, pow10(-e))
+        value = Fraction(value) # "3/7" and the other forms Fraction accepts
+        return value.numerator, value.denominator
+    if isinstance(value, (float, Decimal)):
+        return value.as_integer_ratio()
+    value = Fraction(value)
+    return value.numerator, value.denominator
+
+def decimalOf(value):
+    # normalised (coefficient, exponent) of a value that has a finite decimal expansion
+    if isinstance(value, str):
+        split = splitString(value)
+        if split is not None:
+            return normalize(*split)
+        value = Decimal(value)
+    if isinstance(value, int):
+        return normalize(value, 0)
+    if isinstance(value, Decimal) and value.is_finite():
+        sign, digits, exp = value.as_tuple()
+        c = int("".join(map(str, digits)))
+        return normalize(-c if sign else c, exp)
+    n, d = ratio(value)
+    # n / d is a finite decimal only when d is 2 ** a * 5 ** b, then it is n * (10 ** k // d) / 10 ** k
+    twos = fives = 0
+    rest = d
+    while rest % 2 == 0:
+        rest //= 2
+        twos += 1
+    while rest % 5 == 0:
+        rest //= 5
+        fives += 1
+    if rest != 1:
+        raise Exception(f'{value} has no finite decimal representation')
+    k = max(twos, fives)
+    return normalize(n * (pow10(k) // d), -k)
+
+def toDecimal(c, e):
+    return Decimal(f"{c}E{e}") # exact, the constructor does not round to the context precision
+
+# fixed notation string, never an exponent: "0.00001", "120000", "-1.5"
+
+def toFixed(d):
+    c, e = decimalOf(d)
+    if c == 0:
+        return "0"
+    sign = "-" if c < 0 else ""
+    digits = str(abs(c))
+    if e >= 0:
+        return sign + digits + "0" * e
+    point = len(digits) + e
+    if point > 0:
+        return sign + digits[:point] + "." + digits[point:]
+    return sign + "0." + "0" * -point + digits
+
+# d plus i in the place one past the last significant digit of d: mentDecimal("12.3", 1) == Decimal("12.31")
+
+def mentDecimal(d, i=0):
+    c, e = decimalOf(d)
+    ci, ei = decimalOf(i)
+    ei += e - 1
+    m = min(e, ei)
+    return toDecimal(*normalize(c * pow10(e - m) + ci * pow10(ei - m), m))
+
+def truncate(n, d, STRICT=True):
+    # int(Fraction(n, d)), which rounds towards zero
+    if d == 1:
+        return n
+    if STRICT and n % d:
+        raise AssertionError(f'amount {Fraction(n, d)} must be integer value')
+    return n // d if n >= 0 else -(-n // d)
+
+def intVerify(amount, STRICT=True):
+    return truncate(*ratio(amount), STRICT)
+
+# convert ERC token units to subunits and back, with error checking
+
+def toSbtkn(tknAmt, expDecimals, STRICT=True):
+    n, d = ratio(tknAmt)
+    en, ed = ratio(expDecimals)
+    return truncate(n * en, d * ed, STRICT)
+
+def toTkn(sbtknAmt, expDecimals, STRICT=True):
+    return Fraction(intVerify(sbtknAmt, STRICT), expDecimals)
+
+def scaledPrice(price, mul=1, div=1):
+    # price * mul / div as a reduced (numerator, denominator), e.g. ether per token to wei per subtoken
+    n, d = ratio(price)
+    n, d = n * mul, d * div
+    g = gcd(n, d)
+    return n // g, d // g
+
+# Largest amount <= requested that an order can trade, in integer subtoken units.
+# BUY orders take tokens in multiples of priceDiv, SELL orders give tokens in multiples of priceMul.
+
+def nearestTrade(amount, order_type, price_mul, price_div, order_balance):
+    if order_type == "BUY":
+        return min(amount - amount % price_div, order_balance * price_div // price_mul)
+    if order_type == "SELL":
+        return min(amount - amount % price_mul, order_balance)
+    raise Exception(f'Unknown order type {order_type}')
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+# Gas price oracle. Strategies are tried in order, the result is cached for a ttl. A stale value is
+# returned right away while a refresh runs in the background. Until the first refresh succeeds the
+# fallback price is handed out, so building a transaction never waits on a gas http call, and a
+# failing strategy is tried again at most once per ttl. A refresh thread or asyncio task can keep the value warm.
+
+import asyncio
+import threading
+import time
+
+from web3 import Web3
+
+GAS_TTL = 15               # seconds
+GAS_STATION_URL = 'https://www.ethgasstationapi.com/api/standard'
+ETC_GAS_PRICE = '0.001'    # gwei
+GAS_PERCENTILE = 50
+GAS_HISTORY_BLOCKS = 20
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        raise Exception('NO VALUES FOR PERCENTILE')
+    index = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[index]
+
+# STRATEGIES, each returns a gas price in wei or raises
+
+class FixedGasPrice(object):
+    def __init__(self, provider, gwei):
+        self.wei = provider.toWei(str(gwei), 'gwei')
+
+    def __call__(self):
+        return self.wei
+
+class GasStationGasPrice(object):
+    def __init__(self, provider, session, url=GAS_STATION_URL, timeout=10):
+        self.provider: Web3 = provider
+        self.session = session
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self):
+        req = self.session.get(self.url, timeout=self.timeout)
+        req.raise_for_status()
+        return self.provider.toWei(str(req.json()), 'gwei')
+
+class RpcGasPrice(object):
+    def __init__(self, provider):
+        self.provider: Web3 = provider
+
+    def __call__(self):
+        return int(self.provider.eth.gasPrice)
+
+class FeeHistoryGasPrice(object):
+    # next base fee plus the given percentile of recent priority fees, needs an eip-1559 chain
+    def __init__(self, provider, p=GAS_PERCENTILE, blocks=GAS_HISTORY_BLOCKS):
+        self.provider: Web3 = provider
+        self.p = p
+        self.blocks = blocks
+
+    def __call__(self):
+        history = self.provider.manager.request_blocking("eth_feeHistory", [hex(self.blocks), "latest", [self.p]])
+        base_fee = int(history["baseFeePerGas"][-1], 16)
+        rewards = [int(reward[0], 16) for reward in history["reward"] if reward]
+        return base_fee + percentile(rewards, 50)
+
+class BlockPercentileGasPrice(object):
+    # percentile of the gas prices paid in the latest block, falls back to eth_gasPrice on empty blocks
+    def __init__(self, provider, p=GAS_PERCENTILE):
+        self.provider: Web3 = provider
+        self.p = p
+
+    def __call__(self):
+        block = self.provider.eth.getBlock('latest', True)
+        prices = [int(tx["gasPrice"]) for tx in block["transactions"]]
+        if not prices:
+            return int(self.provider.eth.gasPrice)
+        return percentile(prices, self.p)
+
+class GasOracle(object):
+    def __init__(self, strategies, ttl=GAS_TTL, fallback=None):
+        self.strategies = list(strategies)
+        self.ttl = ttl
+        self.fallback = fallback # wei, or a callable that is called once when the fallback is first needed
+        self.value = None
+        self.updated = 0
+        self.attempted = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        self.attempted = time.monotonic()
+        for strategy in self.strategies:
+            try:
+                value = int(strategy())
+            except Exception as e:
+                self.error = e
+                continue
+            with self._lock:
+                self.value = value
+                self.updated = time.monotonic()
+            return value
+        if self.value is None:
+            return self.fallbackPrice()
+        return self.value
+
+    def fallbackPrice(self):
+        with self._lock:
+            if callable(self.fallback):
+                fallback, self.fallback = self.fallback, None
+                try:
+                    self.fallback = int(fallback())
+                except Exception as e:
+                    self.error = e
+        if self.fallback is None:
+            raise Exception(f'NO GAS PRICE AVAILABLE: {self.error}')
+        return self.fallback
+
+    def __backgroundRefresh(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self.attempted = time.monotonic()
+
+        def run():
+            try:
+                self.refresh()
+            except Exception:
+                pass
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def stale(self):
+        return self.value is None or time.monotonic() - self.updated > self.ttl
+
+    def due(self):
+        # a refresh was never tried, or the last try is older than the ttl
+        return self.attempted is None or time.monotonic() - self.attempted > self.ttl
+
+    def price(self):
+        if self.value is None and self.fallback is None:
+            return self.refresh() # nothing to hand out without a lookup
+        if self.stale() and self.due():
+            self.__backgroundRefresh()
+        if self.value is None:
+            return self.fallbackPrice()
+        return self.value
+
+    def start(self, interval=None):
+        # keep the value warm from a daemon thread
+        if interval is None:
+            interval = self.ttl
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception:
+                    pass
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    async def run(self, interval=None):
+        # asyncio alternative to start(), e.g. asyncio.ensure_future(oracle.run())
+        if interval is None:
+            interval = self.ttl
+        loop = asyncio.get_event_loop()
+        while not self._stop.is_set():
+            try:
+                await loop.run_in_executor(None, self.refresh)
+            except Exception:
+                pass
+            await asyncio.sleep(interval)
+
+def createGasOracle(provider, blockchain, session=None, timeout=10, strategy=None, ttl=GAS_TTL,
+                    p=GAS_PERCENTILE, gwei=None):
+    blockchain = blockchain.upper()
+    if strategy is None:
+        if blockchain == 'ETC':
+            strategy = 'fixed'
+        elif blockchain == 'ETH':
+            strategy = 'station'
+        else:
+            raise Exception(f'Unknown blockchain {blockchain}')
+    if gwei is None and blockchain == 'ETC':
+        gwei = ETC_GAS_PRICE
+
+    # handed out until the first refresh succeeds: the fixed price, or one eth_gasPrice read
+    if gwei is not None:
+        fallback = FixedGasPrice(provider, gwei)()
+    else:
+        fallback = RpcGasPrice(provider)
+
+    if strategy == 'fixed':
+        if gwei is None:
+            raise Exception('fixed gas strategy needs a gas price')
+        strategies = [FixedGasPrice(provider, gwei)]
+    elif strategy == 'station':
+        strategies = [GasStationGasPrice(provider, session, timeout=timeout), RpcGasPrice(provider)]
+    elif strategy == 'rpc':
+        strategies = [RpcGasPrice(provider)]
+    elif strategy == 'feeHistory':
+        strategies = [FeeHistoryGasPrice(provider, p), RpcGasPrice(provider)]
+    elif strategy == 'percentile':
+        strategies = [BlockPercentileGasPrice(provider, p), RpcGasPrice(provider)]
+    else:
+        raise Exception(f'Unknown gas strategy {strategy}')
+    return GasOracle(strategies, ttl, fallback)
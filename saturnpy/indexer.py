@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# Block range indexer for the exchange contract. Pulls logs with eth_getLogs in adaptive chunks,
+# decodes them with the exchange abi and yields them in chain order. The cursor can be saved and
+# passed back in to resume where a previous run stopped.
+
+import time
+from web3 import Web3
+from .utils import AbiDecoder
+
+EXCHANGE_EVENTS = ("NewOrder", "Trade", "OrderCancelled", "OrderFulfilled", "Mined")
+
+class EventIndexer(object):
+    def __init__(self, provider, address, abi, from_block=0, events=EXCHANGE_EVENTS,
+                 chunk_size=5000, min_chunk_size=1, max_chunk_size=100000, target_logs=1000, confirmations=0):
+        self.provider: Web3 = provider
+        self.address = self.provider.toChecksumAddress(address)
+        self.decoder = AbiDecoder(provider, abi)
+        self.events = set(events)
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.target_logs = target_logs
+        self.confirmations = confirmations
+        # next block to fetch, and (blockNumber, logIndex) of the last event handed out
+        self.cursor = {"block": int(from_block), "position": None}
+
+    def getCursor(self):
+        return dict(self.cursor)
+
+    def setCursor(self, cursor):
+        self.cursor = {"block": int(cursor["block"]), "position": cursor.get("position")}
+        if self.cursor["position"] is not None:
+            self.cursor["position"] = tuple(self.cursor["position"])
+
+    def headBlock(self):
+        return self.provider.eth.blockNumber - self.confirmations
+
+    def fetchLogs(self, from_block, to_block):
+        return self.provider.eth.getLogs({
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": self.address
+        })
+
+    def iterEvents(self, to_block=None):
+        if to_block is None:
+            to_block = self.headBlock()
+
+        while self.cursor["block"] <= to_block:
+            start = self.cursor["block"]
+            end = min(start + self.chunk_size - 1, to_block)
+            try:
+                logs = self.fetchLogs(start, end)
+            except Exception:
+                # too many results or a node timeout, retry with a smaller range
+                if self.chunk_size <= self.min_chunk_size:
+                    raise
+                self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+                continue
+
+            for log in logs:
+                position = (log["blockNumber"], log["logIndex"])
+                if self.cursor["position"] is not None and position <= self.cursor["position"]:
+                    continue
+                self.cursor["position"] = position
+                try:
+                    event = self.decoder.decodeEvent(log)
+                except KeyError:
+                    continue # topic not in the abi
+                if event["event"] in self.events:
+                    yield event
+
+            self.cursor["block"] = end + 1
+            if len(logs) < self.target_logs // 2:
+                self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+            elif len(logs) > self.target_logs:
+                self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+
+    def follow(self, poll_interval=5):
+        # never returns, yields new events as blocks arrive
+        while True:
+            yield from self.iterEvents()
+            time.sleep(poll_interval)
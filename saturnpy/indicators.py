@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+# Technical indicators over RequestManager.ohlcv() data. The candle list is converted to a float
+# DataFrame once, every indicator is a vectorised series over it. IndicatorState continues the same
+# recursions one candle at a time, so a new candle costs O(1) instead of a full recompute.
+
+from collections import deque
+import math
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+TIME_COLUMNS = ["time", "timestamp", "date"]
+
+RSI_PERIODS = 14
+EMA_PERIODS = 20
+SMA_PERIODS = 20
+ATR_PERIODS = 14
+BOLLINGER_PERIODS = 20
+BOLLINGER_WIDTH = 2
+
+def ohlcvFrame(ohlcvdata):
+    frame = pd.DataFrame(list(ohlcvdata))
+    for column in TIME_COLUMNS:
+        if column in frame.columns:
+            frame = frame.set_index(column)
+            break
+    columns = [c for c in OHLCV_COLUMNS if c in frame.columns]
+    return frame[columns].astype(np.float64)
+
+def sma(series, periods=SMA_PERIODS):
+    return series.rolling(periods, min_periods=periods).mean()
+
+def ema(series, periods=EMA_PERIODS):
+    return series.ewm(span=periods, adjust=False).mean()
+
+def wilder(series, periods):
+    # Wilder smoothing, seeded with the simple average of the first periods values (leading NaNs from
+    # diff skipped), then avg += (x - avg) / periods
+    values = series.to_numpy(np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < periods:
+        return pd.Series(np.nan, index=series.index)
+    start = valid[0] + periods - 1
+    seeded = values.copy()
+    seeded[:start] = np.nan
+    seeded[start] = np.nanmean(values[valid[0]:start + 1])
+    return pd.Series(seeded, index=series.index).ewm(alpha=1 / periods, adjust=False).mean()
+
+def rsi(close, periods=RSI_PERIODS):
+    change = close.diff()
+    gain = wilder(change.clip(lower=0), periods)
+    loss = wilder(-change.clip(upper=0), periods)
+    out = 100 - 100 / (1 + gain / loss)
+    out[loss == 0] = 100
+    out.iloc[:periods] = np.nan
+    return out
+
+def trueRange(frame):
+    prev_close = frame["close"].shift(1)
+    ranges = pd.concat([
+        frame["high"] - frame["low"],
+        (frame["high"] - prev_close).abs(),
+        (frame["low"] - prev_close).abs()
+    ], axis=1)
+    return ranges.max(axis=1)
+
+def atr(frame, periods=ATR_PERIODS):
+    return wilder(trueRange(frame), periods)
+
+def vwap(frame):
+    typical = (frame["high"] + frame["low"] + frame["close"]) / 3
+    return (typical * frame["volume"]).cumsum() / frame["volume"].cumsum()
+
+def bollinger(close, periods=BOLLINGER_PERIODS, width=BOLLINGER_WIDTH):
+    mid = sma(close, periods)
+    std = close.rolling(periods, min_periods=periods).std(ddof=0)
+    return pd.DataFrame({"bbMid": mid, "bbUpper": mid + width * std, "bbLower": mid - width * std})
+
+def indicatorFrame(frame):
+    out = frame.copy()
+    out["sma"] = sma(frame["close"])
+    out["ema"] = ema(frame["close"])
+    out["rsi"] = rsi(frame["close"])
+    if {"high", "low"} <= set(frame.columns):
+        out["atr"] = atr(frame)
+        if "volume" in frame.columns:
+            out["vwap"] = vwap(frame)
+    return out.join(bollinger(frame["close"]))
+
+class IndicatorState(object):
+    # running state after the last candle of a frame, update() folds in one new candle
+    def __init__(self, frame):
+        close = frame["close"]
+        self.count = len(frame)
+        self.close = close.iloc[-1]
+        self.ema = ema(close).iloc[-1]
+        change = close.diff()
+        self.avg_gain = wilder(change.clip(lower=0), RSI_PERIODS).iloc[-1]
+        self.avg_loss = wilder(-change.clip(upper=0), RSI_PERIODS).iloc[-1]
+        self.atr = atr(frame).iloc[-1]
+        typical = (frame["high"] + frame["low"] + frame["close"]) / 3
+        self.pv = float((typical * frame["volume"]).sum())
+        self.volume = float(frame["volume"].sum())
+        periods = max(SMA_PERIODS, BOLLINGER_PERIODS)
+        self.window = deque(close.iloc[-periods:], maxlen=periods)
+
+    def update(self, candle):
+        o, h, l, c, v = (float(candle[k]) for k in OHLCV_COLUMNS)
+        change = c - self.close
+        true_range = max(h - l, abs(h - self.close), abs(l - self.close))
+
+        self.count += 1
+        self.ema += (c - self.ema) * 2 / (EMA_PERIODS + 1)
+        self.avg_gain += (max(change, 0) - self.avg_gain) / RSI_PERIODS
+        self.avg_loss += (max(-change, 0) - self.avg_loss) / RSI_PERIODS
+        self.atr += (true_range - self.atr) / ATR_PERIODS
+        self.pv += (h + l + c) / 3 * v
+        self.volume += v
+        self.window.append(c)
+        self.close = c
+        return self.latest()
+
+    def latest(self):
+        rsi_value = math.nan
+        if self.count > RSI_PERIODS:
+            rsi_value = 100.0 if self.avg_loss == 0 else 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        window = np.fromiter(self.window, np.float64)
+        sma_value = mid = upper = lower = math.nan
+        if len(window) >= SMA_PERIODS:
+            sma_value = window[-SMA_PERIODS:].mean()
+        if len(window) >= BOLLINGER_PERIODS:
+            mid = window[-BOLLINGER_PERIODS:].mean()
+            std = window[-BOLLINGER_PERIODS:].std()
+            upper, lower = mid + BOLLINGER_WIDTH * std, mid - BOLLINGER_WIDTH * std
+        return {
+            "close": self.close,
+            "sma": sma_value,
+            "ema": self.ema,
+            "rsi": rsi_value,
+            "atr": self.atr,
+            "vwap": self.pv / self.volume if self.volume else math.nan,
+            "bbMid": mid,
+            "bbUpper": upper,
+            "bbLower": lower
+        }
@@ -44,8 +44,10 @@ def derive_public_key(private_key):
     return (2 + parity).to_bytes(1, byteorder='big') + xstr
 
 
-def derive_bip32childkey(parent_key, parent_chain_code, i):
+def derive_bip32childkey(parent_key, parent_chain_code, i, parent_public_key=None):
     """ Derives a child key from an existing key, i is current derivation parameter.
+        parent_public_key can be passed in when already known, it saves the point multiplication
+        of a non hardened step.
         Logic adapted from https://github.com/satoshilabs/slips/blob/master/slip-0010/testvectors.py. """
 
     assert len(parent_key) == 32
@@ -53,6 +55,8 @@ def derive_bip32childkey(parent_key, parent_chain_code, i):
     k = parent_chain_code
     if (i & BIP32_PRIVDEV) != 0:
         key = b'\x00' + parent_key
+    elif parent_public_key is not None:
+        key = parent_public_key
     else:
         key = derive_public_key(parent_key)
     d = key + struct.pack('>L', i)
@@ -149,6 +153,43 @@ def mnemonic_to_private_key(mnemonic, str_derivation_path=LEDGER_ETH_DERIVATION_
     return private_key
 
 
+class HDWallet(object):
+    """ Many accounts from one mnemonic sentence. The BIP39 seed and the node at str_derivation_path
+        are computed once, with the node public key, so each account below it costs one HMAC:
+
+            HDWallet(mnemonic).private_key  -- key of the node itself, same as mnemonic_to_private_key
+            HDWallet(mnemonic).private_keys(0, 10)  -- keys of the children m/44'/60'/0'/0/0 .. /9
+
+    """
+
+    def __init__(self, mnemonic, str_derivation_path=LEDGER_ETH_DERIVATION_PATH, passphrase=""):
+        private_key, chain_code = bip39seed_to_bip32masternode(mnemonic_to_bip39seed(mnemonic, passphrase))
+        for i in parse_derivation_path(str_derivation_path):
+            private_key, chain_code = derive_bip32childkey(private_key, chain_code, i)
+        self.derivation_path = str_derivation_path
+        self.private_key = private_key
+        self.chain_code = chain_code
+        self.public_key = derive_public_key(private_key)
+
+    def child_key(self, index):
+        """ Private key of the non hardened child index of the cached node. """
+
+        if not 0 <= index < BIP32_PRIVDEV:
+            raise ValueError("Child index must be between 0 and 2**31 - 1.")
+        return derive_bip32childkey(self.private_key, self.chain_code, index, self.public_key)[0]
+
+    def private_keys(self, start=0, count=1):
+        """ Private keys of the children start .. start + count - 1. """
+
+        return [self.child_key(i) for i in range(start, start + count)]
+
+    def accounts(self, start=0, count=1):
+        """ eth_account accounts of the children start .. start + count - 1. """
+
+        from eth_account import Account
+        return [Account.privateKeyToAccount(key) for key in self.private_keys(start, count)]
+
+
 if __name__ == '__main__':
     import sys
 
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+# Hands out transaction nonces locally, so several transactions can be signed and sent in one block
+# without a getTransactionCount round trip each. Synced from the pending count on first use.
+
+import threading
+from web3 import Web3
+
+class NonceManager(object):
+    def __init__(self, provider, address):
+        self.provider: Web3 = provider
+        self.address = provider.toChecksumAddress(address)
+        self._next = None
+        self._lock = threading.Lock()
+
+    def __chainNonce(self):
+        return int(self.provider.eth.getTransactionCount(self.address, "pending"))
+
+    def next(self):
+        with self._lock:
+            if self._next is None:
+                self._next = self.__chainNonce()
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def reserve(self, count):
+        # consecutive nonces for a batch of transactions
+        with self._lock:
+            if self._next is None:
+                self._next = self.__chainNonce()
+            nonces = list(range(self._next, self._next + count))
+            self._next += count
+            return nonces
+
+    def release(self, nonce):
+        # a transaction with this nonce was never broadcast
+        with self._lock:
+            if self._next is None:
+                return
+            if nonce == self._next - 1:
+                self._next -= 1
+            elif nonce < self._next:
+                self._next = None # gap in the sequence, resync on next use
+
+    def reset(self):
+        with self._lock:
+            self._next = None
+
+    def resync(self):
+        # reconcile with the node, e.g. after dropped or replaced transactions
+        with self._lock:
+            self._next = self.__chainNonce()
+            return self._next
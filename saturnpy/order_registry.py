@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+# Per chain cache of (exchange contract, order id) -> OrderTerms (priceMul, priceDiv, owner, sell and buy token,
+# tx). Order ids are only unique within one exchange contract. None of the terms change once an order exists,
+# so they are read once, from the order's receipt or in bulk from NewOrder logs with an EventIndexer, and
+# optionally persisted to an SQLite file with the indexer cursor.
+
+import json
+import sqlite3
+import threading
+
+from .records import OrderTerms
+from .utils import checksum
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_terms (
+    chain TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    price_mul TEXT NOT NULL,
+    price_div TEXT NOT NULL,
+    owner TEXT,
+    sell_token TEXT,
+    buy_token TEXT,
+    tx TEXT,
+    PRIMARY KEY (chain, contract, order_id)
+);
+
+CREATE TABLE IF NOT EXISTS order_cursor (
+    chain TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    cursor TEXT NOT NULL,
+    PRIMARY KEY (chain, contract)
+);
+"""
+
+INSERT_BATCH = 1000
+
+def key(contract, order_id):
+    return checksum(contract), int(order_id)
+
+class OrderRegistry(object):
+    def __init__(self, blockchain, path=None):
+        self.blockchain = blockchain.lower()
+        self.path = path
+        self._terms = {} # (contract, order id) -> OrderTerms
+        self._txs = {}   # creating tx -> order id
+        self._cursors = {} # exchange contract -> EventIndexer cursor
+        self._lock = threading.Lock()
+        self.db = None
+        if path is not None:
+            # uint256 values are stored as text, sqlite integers are 64 bit
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            with self._lock:
+                self.db.executescript(SCHEMA)
+                rows = self.db.execute(
+                    "SELECT contract, order_id, price_mul, price_div, owner, sell_token, buy_token, tx FROM order_terms WHERE chain = ?",
+                    (self.blockchain,)
+                )
+                for contract, order_id, price_mul, price_div, owner, sell_token, buy_token, tx in rows:
+                    self.__remember(OrderTerms(contract, int(order_id), int(price_mul), int(price_div), owner, sell_token, buy_token, tx))
+                for contract, cursor in self.db.execute("SELECT contract, cursor FROM order_cursor WHERE chain = ?", (self.blockchain,)):
+                    self._cursors[contract] = json.loads(cursor)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __contains__(self, contract_order):
+        # (contract, order id) in registry
+        return key(*contract_order) in self._terms
+
+    def get(self, contract, order_id):
+        return self._terms.get(key(contract, order_id))
+
+    def orderIdForTx(self, tx):
+        # id of the order a known NewOrder tx created, None otherwise
+        return self._txs.get(tx.lower())
+
+    def price(self, contract, order_id):
+        # (priceMul, priceDiv) or None
+        terms = self._terms.get(key(contract, order_id))
+        if terms is None:
+            return None
+        return terms.price_mul, terms.price_div
+
+    def add(self, terms_list):
+        # returns the number of orders that were not known yet
+        new = []
+        with self._lock:
+            for terms in terms_list:
+                if (terms.contract, terms.order_id) not in self._terms:
+                    self.__remember(terms)
+                    new.append(terms)
+        self.__write(new)
+        return len(new)
+
+    def addEvents(self, events):
+        # decoded events of a receipt or an EventIndexer, anything but NewOrder is skipped
+        return self.add(OrderTerms.fromEvent(event) for event in events if event["event"] == "NewOrder")
+
+    def sync(self, indexer, to_block=None):
+        # reads NewOrder logs from where the last sync of this contract stopped, returns the number of new orders
+        cursor = self._cursors.get(indexer.address)
+        if cursor is not None:
+            indexer.setCursor(cursor)
+        added = 0
+        events = []
+        for event in indexer.iterEvents(to_block):
+            events.append(event)
+            if len(events) >= INSERT_BATCH:
+                added += self.addEvents(events)
+                events = []
+        added += self.addEvents(events)
+        self.__saveCursor(indexer.address, indexer.getCursor())
+        return added
+
+    def __remember(self, terms):
+        self._terms[terms.contract, terms.order_id] = terms
+        if terms.tx is not None:
+            self._txs[terms.tx] = terms.order_id
+
+    def __write(self, terms_list):
+        if self.db is None or not terms_list:
+            return
+        rows = [
+            (self.blockchain, t.contract, str(t.order_id), str(t.price_mul), str(t.price_div), t.owner, t.sell_token, t.buy_token, t.tx)
+            for t in terms_list
+        ]
+        with self._lock:
+            with self.db:
+                self.db.executemany("INSERT OR IGNORE INTO order_terms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def __saveCursor(self, contract, cursor):
+        self._cursors[contract] = cursor
+        if self.db is None:
+            return
+        with self._lock:
+            with self.db:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO order_cursor VALUES (?, ?, ?)",
+                    (self.blockchain, contract, json.dumps(cursor))
+                )
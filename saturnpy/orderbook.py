@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+# In memory order book built from RequestManager.orderbook() json, kept up to date with incremental updates.
+# Prices and amounts are exact Fractions, price levels are kept sorted per side. Cumulative volumes are
+# kept in a Fenwick tree over the price ranks: depth() and volume changes at an existing level are O(log n),
+# adding or removing a level is an O(n) list insert and rebuilds the tree on the next depth() query.
+
+from bisect import bisect_left, bisect_right, insort
+from fractions import Fraction
+
+BUY = "BUY"
+SELL = "SELL"
+
+def orderPrice(order):
+    return Fraction(str(order["price"]))
+
+def orderAmount(order):
+    return Fraction(str(order["balance"]))
+
+def bookOrders(data, order_type):
+    # orders of one type from orderbook json, the ticker api names the lists buys / sells or buy_orders / sell_orders
+    if order_type.upper() == BUY:
+        return data.get("buys", []) + data.get("buy_orders", [])
+    return data.get("sells", []) + data.get("sell_orders", [])
+
+class BookSide(object):
+    # prices are stored ascending, bids read them from the end, asks from the start
+    def __init__(self, descending):
+        self.descending = descending
+        self.prices = []
+        self.volumes = {} # price -> total volume at level
+        self.orders = {}  # price -> {order_id: amount}
+        self._tree = None # Fenwick tree of volumes by price rank, None until needed or after levels changed
+
+    def __len__(self):
+        return len(self.prices)
+
+    def best(self):
+        if not self.prices:
+            return None
+        if self.descending:
+            return self.prices[-1]
+        return self.prices[0]
+
+    def add(self, price, order_id, amount):
+        level = self.orders.get(price)
+        if level is None:
+            level = self.orders[price] = {}
+            self.volumes[price] = Fraction(0)
+            insort(self.prices, price)
+            self._tree = None
+        delta = amount - level.get(order_id, 0)
+        self.volumes[price] += delta
+        level[order_id] = amount
+        self.__change(price, delta)
+
+    def remove(self, price, order_id):
+        level = self.orders[price]
+        amount = level.pop(order_id)
+        self.volumes[price] -= amount
+        if not level:
+            del self.orders[price]
+            del self.volumes[price]
+            del self.prices[bisect_left(self.prices, price)]
+            self._tree = None
+        else:
+            self.__change(price, -amount)
+
+    def __tree(self):
+        if self._tree is None:
+            n = len(self.prices)
+            tree = [Fraction(0)] + [self.volumes[p] for p in self.prices]
+            for i in range(1, n + 1):
+                parent = i + (i & -i)
+                if parent <= n:
+                    tree[parent] += tree[i]
+            self._tree = tree
+        return self._tree
+
+    def __change(self, price, delta):
+        tree = self._tree
+        if tree is None:
+            return
+        i = bisect_left(self.prices, price) + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def __prefix(self, i):
+        # total volume of the i lowest price levels
+        tree = self.__tree()
+        total = Fraction(0)
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def volumeAt(self, price):
+        return self.volumes.get(Fraction(price), Fraction(0))
+
+    def depth(self, price):
+        # total volume at this price or better
+        price = Fraction(price)
+        if self.descending:
+            return self.__prefix(len(self.prices)) - self.__prefix(bisect_left(self.prices, price))
+        return self.__prefix(bisect_right(self.prices, price))
+
+    def levels(self):
+        prices = reversed(self.prices) if self.descending else self.prices
+        return [(p, self.volumes[p]) for p in prices]
+
+class OrderBook(object):
+    def __init__(self, token=None):
+        self.token = token
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.orders = {} # order_id -> (side, price, amount)
+
+    @classmethod
+    def fromJson(cls, data, token=None):
+        book = cls(token)
+        for order in bookOrders(data, BUY) + bookOrders(data, SELL):
+            book.addOrder(order)
+        return book
+
+    def side(self, order_type):
+        order_type = order_type.upper()
+        if order_type == BUY:
+            return self.bids
+        if order_type == SELL:
+            return self.asks
+        raise Exception(f'Unknown order type {order_type}')
+
+# INCREMENTAL UPDATES
+
+    def addOrder(self, order):
+        order_id = int(order["order_id"])
+        self.updateOrder(order_id, order["type"], orderPrice(order), orderAmount(order))
+
+    def updateOrder(self, order_id, order_type, price, amount):
+        order_type = order_type.upper()
+        price = Fraction(price)
+        amount = Fraction(amount)
+        if order_id in self.orders:
+            self.cancelOrder(order_id)
+        if amount <= 0:
+            return
+        self.side(order_type).add(price, order_id, amount)
+        self.orders[order_id] = (order_type, price, amount)
+
+    def fillOrder(self, order_id, amount):
+        order_type, price, remaining = self.orders[order_id]
+        self.updateOrder(order_id, order_type, price, remaining - Fraction(amount))
+
+    def cancelOrder(self, order_id):
+        order_type, price, _ = self.orders.pop(order_id)
+        self.side(order_type).remove(price, order_id)
+
+# QUERIES
+
+    def bestBid(self):
+        return self.bids.best()
+
+    def bestAsk(self):
+        return self.asks.best()
+
+    def spread(self):
+        if not self.bids or not self.asks:
+            return None
+        return self.asks.best() - self.bids.best()
+
+    def volumeAt(self, order_type, price):
+        return self.side(order_type).volumeAt(price)
+
+    def depth(self, order_type, price):
+        return self.side(order_type).depth(price)
+
+    def levels(self, order_type):
+        return self.side(order_type).levels()
+
+    def diff(self, other):
+        # price level changes from self to other as (type, price, old_volume, new_volume), one merge pass per side
+        changes = []
+        for order_type in (BUY, SELL):
+            old, new = self.side(order_type), other.side(order_type)
+            a, b = old.prices, new.prices
+            i = j = 0
+            while i < len(a) or j < len(b):
+                if j >= len(b) or (i < len(a) and a[i] < b[j]):
+                    changes.append((order_type, a[i], old.volumes[a[i]], Fraction(0)))
+                    i += 1
+                elif i >= len(a) or b[j] < a[i]:
+                    changes.append((order_type, b[j], Fraction(0), new.volumes[b[j]]))
+                    j += 1
+                else:
+                    if old.volumes[a[i]] != new.volumes[b[j]]:
+                        changes.append((order_type, a[i], old.volumes[a[i]], new.volumes[b[j]]))
+                    i += 1
+                    j += 1
+        return changes
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+# Waits for many transactions with one polling loop instead of one blocked thread per transaction.
+# On every new block the receipts of all pending hashes are fetched in one batched request, and the
+# future of each mined transaction is resolved. With a websocket provider new blocks come from a
+# newHeads subscription instead of polling eth_blockNumber.
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future
+
+from web3 import Web3, WebsocketProvider
+from web3.datastructures import AttributeDict
+from web3.middleware.pythonic import receipt_formatter
+from .batch import RpcBatch
+
+RECEIPT_TIMEOUT = 120
+POLL_INTERVAL = 1
+
+class ReceiptWatcher(object):
+    def __init__(self, provider, session=None, timeout=None, poll_interval=POLL_INTERVAL):
+        self.provider: Web3 = provider
+        self.session = session
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.websocket = isinstance(provider.provider, WebsocketProvider)
+        self.pending = {} # txhash -> [future, deadline, callbacks]
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_block = None
+
+    def watch(self, txhash, timeout=RECEIPT_TIMEOUT, callback=None) -> Future:
+        if isinstance(txhash, str):
+            txhash = txhash.lower()
+        else:
+            txhash = self.provider.toHex(txhash)
+        with self._lock:
+            entry = self.pending.get(txhash)
+            if entry is None:
+                entry = self.pending[txhash] = [Future(), time.monotonic() + timeout, []]
+            else:
+                entry[1] = max(entry[1], time.monotonic() + timeout)
+            future = entry[0]
+            if callback is not None:
+                future.add_done_callback(lambda f: callback(txhash, f.result()) if f.exception() is None else None)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.__run, daemon=True)
+                self._thread.start()
+        return future
+
+    def wait(self, txhash, timeout=RECEIPT_TIMEOUT):
+        return self.watch(txhash, timeout).result()
+
+    def waitAll(self, txhashes, timeout=RECEIPT_TIMEOUT):
+        futures = [self.watch(txhash, timeout) for txhash in txhashes]
+        return [future.result() for future in futures]
+
+    def __check(self):
+        with self._lock:
+            txhashes = list(self.pending)
+        if not txhashes:
+            return
+
+        batch = RpcBatch(self.provider, self.session, self.timeout)
+        for txhash in txhashes:
+            batch.getTransactionReceipt(txhash)
+        try:
+            receipts = batch.execute(raise_errors=False)
+        except Exception:
+            receipts = [None] * len(txhashes)
+
+        now = time.monotonic()
+        for txhash, receipt in zip(txhashes, receipts):
+            if receipt is not None and not isinstance(receipt, Exception) and receipt.get("blockHash") is not None:
+                # raw batch results are json, formatted like web3's getTransactionReceipt result
+                if not isinstance(receipt, AttributeDict):
+                    receipt = AttributeDict.recursive(receipt_formatter(receipt))
+                with self._lock:
+                    entry = self.pending.pop(txhash, None)
+                if entry is not None:
+                    entry[0].set_result(receipt)
+                continue
+            with self._lock:
+                entry = self.pending.get(txhash)
+                if entry is not None and entry[1] < now:
+                    del self.pending[txhash]
+                else:
+                    entry = None
+            if entry is not None:
+                entry[0].set_exception(Exception(f'TIMEOUT AWAITING RECEIPT {txhash}'))
+
+    def __done(self):
+        with self._lock:
+            if not self.pending:
+                self._thread = None
+                return True
+        return False
+
+    def __run(self):
+        if self.websocket:
+            try:
+                asyncio.new_event_loop().run_until_complete(self.__runWebsocket())
+                return
+            except Exception:
+                pass # subscription failed, fall back to polling
+        self.__runPolling()
+
+    def __runPolling(self):
+        while not self.__done():
+            try:
+                block = self.provider.eth.blockNumber
+            except Exception:
+                block = None
+            if block is None or block != self._last_block:
+                self._last_block = block
+                self.__check()
+            else:
+                self.__expire()
+            time.sleep(self.poll_interval)
+
+    async def __runWebsocket(self):
+        import websockets
+        async with websockets.connect(self.provider.provider.endpoint_uri) as ws:
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}))
+            await ws.recv()
+            self.__check()
+            while not self.__done():
+                try:
+                    await asyncio.wait_for(ws.recv(), self.poll_interval)
+                    self.__check()
+                except asyncio.TimeoutError:
+                    self.__expire()
+
+    def __expire(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [(txhash, entry) for txhash, entry in self.pending.items() if entry[1] < now]
+            for txhash, _ in expired:
+                del self.pending[txhash]
+        for txhash, entry in expired:
+            entry[0].set_exception(Exception(f'TIMEOUT AWAITING RECEIPT {txhash}'))
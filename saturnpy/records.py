@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+# Typed records for ticker api json. Fields are normalised once in fromJson: int ids, checksummed
+# addresses, Fraction prices and amounts, float timestamps. __slots__ keeps them small, Columns
+# stores long lists of one record type column by column.
+
+from array import array
+from datetime import datetime
+from fractions import Fraction
+
+from .utils import checksum, etheraddress
+
+TIME_KEYS = ("timestamp", "time", "created_at", "date")
+
+def toTimestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+def firstKey(record, keys):
+    for key in keys:
+        if record.get(key) is not None:
+            return record[key]
+    return None
+
+def toFraction(value):
+    if value is None:
+        return None
+    return Fraction(str(value))
+
+def toAddress(value):
+    if isinstance(value, dict):
+        value = value.get("address")
+    if not value:
+        return None
+    return checksum(value)
+
+class Record(object):
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+        for name in self.__slots__[len(args):]:
+            setattr(self, name, kwargs.get(name))
+
+    def toDict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)})'
+
+class Order(Record):
+    __slots__ = ("order_id", "tx", "type", "contract", "owner", "buy_token", "sell_token", "token",
+                 "price", "balance", "active", "timestamp")
+
+    @classmethod
+    def fromJson(cls, data):
+        buy_token = toAddress(data.get("buytoken"))
+        sell_token = toAddress(data.get("selltoken"))
+        # the traded token is whichever side is not ether
+        token = sell_token if sell_token is not None and sell_token != etheraddress else buy_token
+        return cls(
+            int(data["order_id"]),
+            data.get("transaction"),
+            str(data.get("type", "")).upper(),
+            toAddress(data.get("contract")),
+            toAddress(data.get("owner")),
+            buy_token,
+            sell_token,
+            token,
+            toFraction(data.get("price")),
+            toFraction(data.get("balance")),
+            bool(data.get("active", True)),
+            toTimestamp(firstKey(data, TIME_KEYS))
+        )
+
+class Trade(Record):
+    __slots__ = ("tx", "order_id", "type", "token", "buyer", "seller", "price", "amount", "timestamp")
+
+    @classmethod
+    def fromJson(cls, data):
+        order_id = firstKey(data, ("order_id", "orderId"))
+        return cls(
+            firstKey(data, ("transaction", "tx", "txhash", "hash")),
+            None if order_id is None else int(order_id),
+            str(firstKey(data, ("type", "ordertype")) or "").upper(),
+            toAddress(firstKey(data, ("token", "tokenaddress"))),
+            toAddress(data.get("buyer")),
+            toAddress(data.get("seller")),
+            toFraction(data.get("price")),
+            toFraction(firstKey(data, ("amount", "tokenamount", "token_amount"))),
+            toTimestamp(firstKey(data, TIME_KEYS))
+        )
+
+class TokenInfo(Record):
+    __slots__ = ("address", "symbol", "name", "decimals", "best_buy_order_tx", "best_sell_order_tx")
+
+    @classmethod
+    def fromJson(cls, data):
+        decimals = data.get("decimals")
+        return cls(
+            toAddress(data.get("address")),
+            data.get("symbol"),
+            data.get("name"),
+            None if decimals is None else int(decimals),
+            data.get("best_buy_order_tx"),
+            data.get("best_sell_order_tx")
+        )
+
+class Candle(Record):
+    __slots__ = ("time", "open", "high", "low", "close", "volume")
+
+    @classmethod
+    def fromJson(cls, data):
+        return cls(
+            toTimestamp(firstKey(data, TIME_KEYS)),
+            float(data["open"]), float(data["high"]), float(data["low"]),
+            float(data["close"]), float(data["volume"])
+        )
+
+class OrderTerms(Record):
+    # what a NewOrder event fixes for the lifetime of an order, integer price and checksummed addresses.
+    # Order ids are counted per exchange contract, contract is the address that emitted the event
+    __slots__ = ("contract", "order_id", "price_mul", "price_div", "owner", "sell_token", "buy_token", "tx")
+
+    @classmethod
+    def fromEvent(cls, event):
+        args = event["args"]
+        tx = event.get("transactionHash")
+        if tx is not None and not isinstance(tx, str):
+            tx = "0x" + bytes(tx).hex()
+        return cls(
+            toAddress(event["address"]),
+            int(args["id"]),
+            int(args["priceMul"]),
+            int(args["priceDiv"]),
+            toAddress(args["owner"]),
+            toAddress(args["sellToken"]),
+            toAddress(args["buyToken"]),
+            None if tx is None else tx.lower()
+        )
+
+    @property
+    def price(self):
+        # AbiDecoder.integerPrice form, as used in preTradeState
+        return {"mul": self.price_mul, "div": self.price_div, "id": self.order_id}
+
+def asOrder(order):
+    # exchange functions take an Order or the raw order json
+    if isinstance(order, Order):
+        return order
+    return Order.fromJson(order)
+
+class Columns(object):
+    # one list per field instead of one object per record, numeric fields listed in TYPECODES are packed arrays
+    # (None is stored as nan / -1 there)
+    TYPECODES = {
+        Candle: {"time": "d", "open": "d", "high": "d", "low": "d", "close": "d", "volume": "d"},
+        Trade: {"timestamp": "d"},
+        Order: {"order_id": "q", "timestamp": "d"}
+    }
+
+    def __init__(self, cls, records=()):
+        self.cls = cls
+        typecodes = self.TYPECODES.get(cls, {})
+        self.columns = {n: array(typecodes[n]) if n in typecodes else [] for n in cls.__slots__}
+        self.extend(records)
+
+    def append(self, record):
+        for name, column in self.columns.items():
+            value = getattr(record, name)
+            if isinstance(column, array) and value is None:
+                value = float("nan") if column.typecode == "d" else -1
+            column.append(value)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.columns[self.cls.__slots__[0]])
+
+    def __getitem__(self, i):
+        return self.cls(*(self.columns[n][i] for n in self.cls.__slots__))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def column(self, name):
+        return self.columns[name]
@@ -1,37 +1,131 @@
 from statistics import mean
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .utils import etheraddress
+from .cache import TTLCache, MISSING
+from .orderbook import OrderBook
+from .receipt_watcher import ReceiptWatcher, RECEIPT_TIMEOUT
+from .stream import iterRecords, STREAM_CHUNK
+from .records import Order, Trade, TokenInfo, Candle, toTimestamp, firstKey, TIME_KEYS
+
+# http session defaults, can be overwritten in the Saturn settings
+HTTP_POOL_CONNECTIONS = 10  # number of host pools kept alive
+HTTP_POOL_MAXSIZE = 10      # max keep-alive connections per host
+HTTP_TIMEOUT = 10           # seconds, connect and read
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.3          # sleeps 0.3s, 0.6s, 1.2s, ... between retries
+
+# response cache, seconds per endpoint. None caches forever, 0 disables caching for the endpoint
+CACHE_SIZE = 1024
+CACHE_TTL = {
+    "getTransaction": None,       # mined tx lookups never change
+    "getOrderByTx": 2,            # active and balance change with every trade
+    "getTradeByTx": None,
+    "getExchangeContract": 3600,
+    "getTokenInfo": 10,
+    "orderbook": 0,
+    "ohlcv": 0,
+    "tradeHistory": 0,
+    "ordersForAddress": 0
+}
+
+def createSession(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                  retries=HTTP_RETRIES, backoff=HTTP_BACKOFF):
+    # only GETs are retried after the request was sent. The session also carries JSON-RPC POSTs, and a repeated
+    # eth_sendRawTransaction batch turns an accepted transaction into a "known transaction" / "nonce too low" error
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        method_whitelist=frozenset(["GET"])
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 class RequestManager():
     payload = {'Origin': 'saturnpy'}
-    def __init__(self, apiurl, provider, wallet, blockchain):
+    def __init__(self, apiurl, provider, wallet, blockchain, session=None, timeout=HTTP_TIMEOUT, cache=None, ttl=None, watcher=None):
         self.apiurl = apiurl
         self.provider = provider
         self.wallet = wallet
         self.blockchain = blockchain
+        self.timeout = timeout
+        if session is None:
+            session = createSession()
+        self.session: requests.Session = session
+        if cache is None:
+            cache = TTLCache(CACHE_SIZE)
+        self.cache = cache
+        self.ttl = dict(CACHE_TTL)
+        if ttl is not None:
+            self.ttl.update(ttl)
+        if watcher is None:
+            watcher = ReceiptWatcher(provider, session, timeout)
+        self.watcher = watcher
+
+    def get(self, url: str, params=None):
+        if params is None:
+            params = self.payload
+        try:
+            data = self.session.get(url, params=params, timeout=self.timeout)
+            data.raise_for_status()
+        except Exception:
+            raise Exception(f"ERROR GET URL: {url}")
+        return data.json()
 
-    def getTransaction(self, tx: str):
-        url = f"{self.apiurl}transactions/{self.blockchain}/{tx}.json"
+    def stream(self, url: str, params=None):
+        # raw response body chunks, nothing is buffered beyond one chunk
+        if params is None:
+            params = self.payload
         try:
-            data = requests.get(url, params=self.payload)
-        except:
+            response = self.session.get(url, params=params, timeout=self.timeout, stream=True)
+            response.raise_for_status()
+        except Exception:
             raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            return data.json()
+        with response:
+            yield from response.iter_content(STREAM_CHUNK)
+
+    def getCached(self, endpoint: str, key: str, url: str):
+        ttl = self.ttl.get(endpoint, 0)
+        if ttl == 0:
+            return self.get(url)
+        data = self.cache.get((endpoint, key), MISSING)
+        if data is MISSING:
+            data = self.get(url)
+            # empty responses mean the ticker has not indexed the tx yet, ask again next time
+            if data:
+                self.cache.set((endpoint, key), data, ttl)
+        return data
+
+    def invalidate(self, endpoint: str = None, key: str = None):
+        if endpoint is None:
+            self.cache.clear()
+        elif key is None:
+            self.cache.invalidateWhere(lambda k: k[0] == endpoint)
+        else:
+            self.cache.invalidate((endpoint, key))
+
+    def cacheStats(self):
+        return self.cache.stats()
+
+    def getTransaction(self, tx: str):
+        url = f"{self.apiurl}transactions/{self.blockchain}/{tx}.json"
+        return self.getCached("getTransaction", tx.lower(), url)
 
     def getOrderByTx(self, tx: str):
         url = f"{self.apiurl}orders/by_tx/{self.blockchain}/{tx}.json"
-        try:
-            data = requests.get(url, params=self.payload)
-        except:
-            raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            return data.json()
+        return self.getCached("getOrderByTx", tx.lower(), url)
+
+    def getOrder(self, tx: str):
+        return Order.fromJson(self.getOrderByTx(tx))
 
     def awaitOrderTx(self, tx):
         try:
-            self.provider.eth.waitForTransactionReceipt(tx, timeout=120)
+            self.watcher.wait(tx, RECEIPT_TIMEOUT)
         except:
             errmessage = 'ERROR AWAITING ORDER RECEIPT'
             raise Exception(f"ERROR\n{errmessage}\n{tx}")
@@ -41,16 +135,11 @@ class RequestManager():
 
     def getTradeByTx(self, tx: str):
         url = f"{self.apiurl}trades/by_tx/{self.blockchain}/{tx}.json"
-        try:
-            data = requests.get(url, params=self.payload)
-        except:
-            raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            return data.json()
+        return self.getCached("getTradeByTx", tx.lower(), url)
 
     def awaitTradeTx(self, tx):
         try:
-            self.provider.eth.waitForTransactionReceipt(tx, timeout=120)
+            self.watcher.wait(tx, RECEIPT_TIMEOUT)
         except:
             errmessage = 'ERROR AWAITING TRADE RECEIPT'
             raise Exception(f"ERROR\n{errmessage}\n{tx}")
@@ -60,56 +149,50 @@ class RequestManager():
 
     def getTokenInfo(self, address: str):
         url = f"{self.apiurl}tokens/show/{self.blockchain}/{address.lower()}.json"
-        try:
-            data = requests.get(url, params=self.payload)
-        except:
-            raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            return data.json()
+        return self.getCached("getTokenInfo", address.lower(), url)
+
+    def tokenInfo(self, address: str):
+        return TokenInfo.fromJson(self.getTokenInfo(address))
 
     def getExchangeContract(self, blockchain=None):
         if blockchain is None:
             blockchain = self.blockchain
         url = f"{self.apiurl}orders/contracts.json"
-        try:
-            data = requests.get(url, params=self.payload)
-        except:
-            raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            data = data.json()
-            result = data[blockchain.upper()]
-            return result
+        data = self.getCached("getExchangeContract", "contracts", url)
+        return data[blockchain.upper()]
 
     def ordersForAddress(self, address: str):
         url = f"{self.apiurl}orders/trader/{address.lower()}.json"
-        try:
-            data = requests.get(url, params=self.payload)
-        except:
-            raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            data = data.json()
-            sell_orders = pd.Series(data["sell_orders"])
-            buy_orders = pd.Series(data["buy_orders"])
+        import pandas as pd # imported on first use, it is the slowest import of the package
+        data = self.get(url)
+        return pd.Series(data["sell_orders"] + data["buy_orders"])
 
-            return pd.concat([sell_orders, buy_orders], ignore_index=True)
+    def iterOrders(self, address: str, raw=False):
+        # same orders as ordersForAddress, sells then buys, parsed one at a time from the response stream
+        url = f"{self.apiurl}orders/trader/{address.lower()}.json"
+        for order in iterRecords(self.stream(url), (("sell_orders",), ("buy_orders",))):
+            yield order if raw else Order.fromJson(order)
 
     def orderbook(self, token: str):
         url = f"{self.apiurl}orders/{self.blockchain}/{token.lower()}/{str(etheraddress)}/all.json"
-        try:
-            data = requests.get(url, params=self.payload)
-        except:
-            raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            return data.json()
+        return self.get(url)
+
+    def orderBook(self, token: str):
+        return OrderBook.fromJson(self.orderbook(token), token)
 
     def ohlcv(self, token: str):
         url = f"{self.apiurl}tokens/ohlcv/{self.blockchain}/{token.lower()}/24h.json"
-        try:
-            data = requests.get(url, params=self.payload)
-        except:
-            raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            return data.json()
+        return self.get(url)
+
+    def candles(self, token: str):
+        return [Candle.fromJson(candle) for candle in self.ohlcv(token)]
+
+    def indicators(self, token: str, ohlcvdata=None):
+        # DataFrame of the candles with sma, ema, rsi (Wilder), atr, vwap and bollinger band columns
+        from .indicators import ohlcvFrame, indicatorFrame # numpy / pandas
+        if ohlcvdata is None:
+            ohlcvdata = self.ohlcv(token.lower())
+        return indicatorFrame(ohlcvFrame(ohlcvdata))
 
     def getRSI(self, token: str, periods: int = 14, ohlcvdata=None):
         if ohlcvdata is None:
@@ -138,9 +221,14 @@ class RequestManager():
 
     def tradeHistory(self, token: str):
         url = f"{self.apiurl}trades/{self.blockchain}/{token.lower()}/{etheraddress.lower()}/all.json"
-        try:
-            data = requests.get(url, params=self.payload)
-        except:
-            raise Exception(f"ERROR GET URL: {url}")
-        finally:
-            return data.json()
+        return self.get(url)
+
+    def iterTrades(self, token: str, since=None, raw=False):
+        # tradeHistory parsed one trade at a time, since skips trades older than a timestamp or iso date
+        url = f"{self.apiurl}trades/{self.blockchain}/{token.lower()}/{etheraddress.lower()}/all.json"
+        since = toTimestamp(since)
+        # the trades are either the top level array or under a "trades" key
+        for trade in iterRecords(self.stream(url), ((), ("trades",))):
+            if since is not None and (toTimestamp(firstKey(trade, TIME_KEYS)) or 0) < since:
+                continue
+            yield trade if raw else Trade.fromJson(trade)
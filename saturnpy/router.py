@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+# Sweep planning for ExchangeInterface.marketTrade. Walks the book from the best price and takes the
+# nearest valid trade of each order (same integer rules as verifyCapacity) until the size is filled.
+
+from .utils import nearestTrade, checksum
+
+def tradedAmount(events, order):
+    # subtokens traded against order in a receipt's decoded events. Trade is emitted from the taker's side:
+    # soldTokens is what the taker gave (the order's buy token), boughtTokens what it got (the order's sell token)
+    field = "boughtTokens" if order.type == "SELL" else "soldTokens"
+    contract = checksum(order.contract)
+    return sum(
+        int(event["args"][field]) for event in events
+        if event["event"] == "Trade" and int(event["args"]["orderId"]) == order.order_id
+        and checksum(event["address"]) == contract
+    )
+
+def planSweep(amount, candidates):
+    # amount in subtokens, candidates sorted best price first, each a dict with
+    # order, type, mul, div and remaining. Returns legs as (candidate, leg_amount) and the unfilled rest.
+    legs = []
+    rest = int(amount)
+    for candidate in candidates:
+        if rest <= 0:
+            break
+        leg = nearestTrade(rest, candidate["type"], candidate["mul"], candidate["div"], candidate["remaining"])
+        if leg <= 0:
+            continue
+        legs.append((candidate, leg))
+        rest -= leg
+    return legs, rest
+
+class MarketTrade(object):
+    def __init__(self, decoder, requested, legs, batch):
+        self.decoder = decoder
+        self.requested = requested
+        self.legs = legs   # [(candidate, leg_amount)]
+        self.batch = batch # TxBatch, same order as legs
+        self.expected = sum(leg for _, leg in legs)
+
+    def txhashes(self):
+        return list(self.batch)
+
+    def wait(self, timeout=120):
+        # expected vs actual fill in subtokens, from the Trade events of each leg's order
+        receipts = self.batch.wait(timeout)
+        actual = 0
+        fills = []
+        for (candidate, leg), txhash, receipt in zip(self.legs, self.batch, receipts):
+            filled = 0
+            if receipt is not None and receipt["status"] == 1:
+                filled = tradedAmount(self.decoder.decodeLogs(receipt["logs"]), candidate["order"])
+            actual += filled
+            fills.append({
+                "order_id": candidate["order"].order_id,
+                "transaction": txhash,
+                "expected": leg,
+                "filled": filled
+            })
+        return {
+            "requested": self.requested,
+            "expected": self.expected,
+            "actual": actual,
+            "legs": fills
+        }
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+# Saturn builds the ticker api client and the exchange interface from one settings dict.
+
+from eth_account import Account
+from web3 import Web3, HTTPProvider, IPCProvider, WebsocketProvider
+from saturnpy.request_manager import (
+    RequestManager, createSession,
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF,
+    CACHE_SIZE
+)
+from saturnpy.cache import TTLCache
+from saturnpy.receipt_watcher import ReceiptWatcher, POLL_INTERVAL
+from saturnpy.exchange import ExchangeInterface
+from saturnpy.account_pool import AccountPool
+from saturnpy.token_registry import TokenRegistry
+from saturnpy.order_registry import OrderRegistry
+from saturnpy.store import MarketStore
+from saturnpy.tx_pipeline import TxPipeline, SIGN_WORKERS, QUEUE_SIZE, BROADCAST_BATCH
+from saturnpy.gas_oracle import createGasOracle, GAS_TTL, GAS_PERCENTILE
+
+class Saturn(object):
+    def __init__(self, settings):
+        self.apiurl : str = settings["apiUrl"]
+        self.testmode = False
+        if "providerType" in settings:
+            pT = settings["providerType"]
+            if pT == "HTTPProvider":
+                self.provider : Web3 = Web3(HTTPProvider(settings["providerUrl"]))
+            elif pT == "IPCProvider":
+                self.provider : Web3 = Web3(IPCProvider(settings["providerUrl"]))
+            elif pT == "WebsocketProvider":
+                self.provider : Web3 = Web3(WebsocketProvider(settings["providerUrl"]))
+        else:
+            self.provider : Web3 = Web3(HTTPProvider(settings["providerUrl"]))
+
+        self.hdwallet = None
+        if "mnemonicKey" in settings:
+            from saturnpy.mnemonic_utils import HDWallet # ecdsa and base58, only needed here
+            self.hdwallet = HDWallet(settings["mnemonicKey"])
+            self.wallet : Account = Account.privateKeyToAccount(self.hdwallet.private_key)
+        if "privateKey" in settings:
+            self.wallet : Account = Account.privateKeyToAccount(str(settings["privateKey"]))
+
+        self.blockchain : str = str(settings["blockchain"]).lower()
+        self.myaddress : str = self.wallet.address
+
+        # pooled keep-alive http session, shared by the ticker api queries and the gas price lookup
+        self.session = createSession(
+            settings.get("httpPoolConnections", HTTP_POOL_CONNECTIONS),
+            settings.get("httpPoolMaxsize", HTTP_POOL_MAXSIZE),
+            settings.get("httpRetries", HTTP_RETRIES),
+            settings.get("httpBackoff", HTTP_BACKOFF)
+        )
+        self.query = RequestManager(
+            self.apiurl, self.provider, self.wallet, self.blockchain,
+            self.session, settings.get("httpTimeout", HTTP_TIMEOUT),
+            TTLCache(settings.get("cacheSize", CACHE_SIZE)), settings.get("cacheTTL"),
+            ReceiptWatcher(
+                self.provider, self.session, settings.get("httpTimeout", HTTP_TIMEOUT),
+                settings.get("receiptPollInterval", POLL_INTERVAL)
+            )
+        )
+
+        # optional on disk store for trades, candles and orders, filled with store.sync(query, token)
+        self.store = None
+        if "storePath" in settings:
+            self.store = MarketStore(settings["storePath"], self.blockchain)
+
+        if "testMode" in settings:
+            if bool(settings["testMode"]) == True:
+                print("TEST MODE ENABLED, TRANSACTION WONT BE BROADCASTED")
+                self.testmode = True
+
+        # The following flag values default to False, to allow the simplest and best trading experience for most users.
+        # SBTKN False means TRADES ARE REQUESTED IN DECIMAL TOKEN UNITS. True means they are requested in integer subtoken units.
+        # BNDL False means WE DO NOT ALLOW BUNDLE PRICING ON NEW ORDERS, ONLY INTEGER PRICES. True means we allow Fraction prices.
+        # STRICT False means WE CREATE OR EXECUTE NEAREST VALID TRADE <= REQUESTED TRADE. True means invalid trades throw an error.
+        # These flags can and should be ignored and left out of function calls unless the user wants to change them.
+        self.SBTKN = False
+        self.STRICT = False
+        self.BNDL = False
+        self.DEBUG = False
+
+        if "SBTKN" in settings:
+            self.SBTKN = settings["SBTKN"]
+        if "STRICT" in settings:
+            self.STRICT = settings["STRICT"]
+        if "BNDL" in settings:
+            self.BNDL = settings["BNDL"]
+
+        if "DEBUG" in settings:
+            self.DEBUG = settings["DEBUG"]
+
+        self.tokens = TokenRegistry(self.provider, self.blockchain, settings.get("tokenCachePath"))
+        self.orders = OrderRegistry(self.blockchain, settings.get("orderCachePath"))
+        self.gas = createGasOracle(
+            self.provider, self.blockchain, self.session, settings.get("httpTimeout", HTTP_TIMEOUT),
+            settings.get("gasStrategy"), settings.get("gasTTL", GAS_TTL),
+            settings.get("gasPercentile", GAS_PERCENTILE), settings.get("gasPrice")
+        )
+        self.pipeline = TxPipeline(
+            self.provider, self.wallet, self.session, settings.get("httpTimeout", HTTP_TIMEOUT),
+            settings.get("signWorkers", SIGN_WORKERS), settings.get("signProcesses", False),
+            settings.get("broadcastQueueSize", QUEUE_SIZE), settings.get("broadcastBatch", BROADCAST_BATCH)
+        )
+        self.exchange = self.exchangeFor(self.wallet)
+
+        # optional pool of trading accounts: "accountCount" children of the mnemonic node starting at
+        # "accountStart", or a "privateKeys" list. Orders are spread over them with self.accounts
+        self.accounts = None
+        wallets = []
+        if "accountCount" in settings:
+            if self.hdwallet is None:
+                raise Exception('accountCount NEEDS A mnemonicKey SETTING')
+            wallets = self.hdwallet.accounts(settings.get("accountStart", 0), settings["accountCount"])
+        if "privateKeys" in settings:
+            wallets += [Account.privateKeyToAccount(str(key)) for key in settings["privateKeys"]]
+        if wallets:
+            self.accounts = AccountPool(self.exchangeFor(wallet) for wallet in wallets)
+
+        if "gasRefreshInterval" in settings:
+            self.exchange.gas.start(settings["gasRefreshInterval"])
+        print("TRADING WALLET: " + self.myaddress)
+        if self.accounts is not None:
+            print(f"ACCOUNT POOL: {len(self.accounts)} ACCOUNTS")
+
+    def exchangeFor(self, wallet):
+        # one ExchangeInterface per account, the token and order registries, gas oracle and pipeline are shared
+        return ExchangeInterface(
+            self.provider, wallet, self.query,
+            self.blockchain, self.testmode,
+            self.SBTKN, self.STRICT, self.BNDL,
+            self.DEBUG, self.tokens, self.gas, self.pipeline, self.orders
+        )
+
+class AsyncSaturn(Saturn):
+    # Same as Saturn, but query is an AsyncRequestManager. exchange keeps its blocking web3 calls
+    # and uses a synchronous RequestManager internally.
+    def __init__(self, settings):
+        super().__init__(settings)
+        from saturnpy.aio import AsyncRequestManager, ASYNC_CONCURRENCY
+        self.query = AsyncRequestManager(
+            self.apiurl, self.blockchain,
+            settings.get("asyncConcurrency", ASYNC_CONCURRENCY),
+            settings.get("httpTimeout", HTTP_TIMEOUT),
+            settings.get("httpPoolMaxsize", HTTP_POOL_MAXSIZE),
+            settings.get("httpRetries", HTTP_RETRIES),
+            settings.get("httpBackoff", HTTP_BACKOFF),
+            TTLCache(settings.get("cacheSize", CACHE_SIZE)), settings.get("cacheTTL")
+        )
+
+    async def close(self):
+        await self.query.close()
+        self.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+# Local SQLite store for trades, candles and orders per (chain, token). sync* pulls from the ticker api
+# and inserts only rows that are not stored yet. Range queries are answered from the indexed tables.
+
+import json
+import sqlite3
+import threading
+
+from .orderbook import bookOrders, BUY, SELL
+from .records import toTimestamp, firstKey, TIME_KEYS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    chain TEXT NOT NULL,
+    token TEXT NOT NULL,
+    tx TEXT NOT NULL,
+    ts REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (chain, token, tx)
+);
+CREATE INDEX IF NOT EXISTS trades_time ON trades (chain, token, ts);
+
+CREATE TABLE IF NOT EXISTS candles (
+    chain TEXT NOT NULL,
+    token TEXT NOT NULL,
+    ts REAL NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (chain, token, ts)
+);
+
+CREATE TABLE IF NOT EXISTS orders (
+    chain TEXT NOT NULL,
+    token TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    order_id INTEGER NOT NULL,
+    tx TEXT,
+    type TEXT,
+    price TEXT,
+    balance TEXT,
+    active INTEGER,
+    ts REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (chain, contract, order_id)
+);
+CREATE INDEX IF NOT EXISTS orders_token ON orders (chain, token, type, active);
+"""
+
+TX_KEYS = ("transaction", "tx", "txhash", "hash")
+INSERT_ORDER = "INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_BATCH = 1000
+
+class MarketStore(object):
+    def __init__(self, path, blockchain):
+        self.path = path
+        self.blockchain = blockchain.lower()
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self._lock:
+            self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+# SYNC
+
+    def insertTrades(self, token, trades):
+        # trades may be a generator, rows are written in batches so it is never materialised
+        token = token.lower()
+        inserted = 0
+        rows = []
+        for trade in trades:
+            tx = firstKey(trade, TX_KEYS)
+            if tx is None:
+                continue
+            rows.append((self.blockchain, token, tx.lower(), toTimestamp(firstKey(trade, TIME_KEYS)), json.dumps(trade)))
+            if len(rows) >= INSERT_BATCH:
+                inserted += self.__insertTradeRows(rows)
+                rows = []
+        return inserted + self.__insertTradeRows(rows)
+
+    def __insertTradeRows(self, rows):
+        with self._lock, self.db:
+            before = self.db.total_changes
+            self.db.executemany("INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?)", rows)
+            return self.db.total_changes - before
+
+    def insertCandles(self, token, candles):
+        token = token.lower()
+        rows = [
+            (self.blockchain, token, toTimestamp(firstKey(c, TIME_KEYS)),
+             float(c["open"]), float(c["high"]), float(c["low"]), float(c["close"]), float(c["volume"]))
+            for c in candles
+        ]
+        with self._lock, self.db:
+            # the newest candle may still be open, so candles are replaced instead of ignored
+            self.db.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def __orderRows(self, token, orders):
+        # order ids are counted per exchange contract
+        return [
+            (self.blockchain, token, (o.get("contract") or "").lower(), int(o["order_id"]), o.get("transaction"), o.get("type"),
+             str(o.get("price")), str(o.get("balance")), int(bool(o.get("active", True))),
+             toTimestamp(firstKey(o, TIME_KEYS)), json.dumps(o))
+            for o in orders
+        ]
+
+    def insertOrders(self, token, orders):
+        rows = self.__orderRows(token.lower(), orders)
+        with self._lock, self.db:
+            self.db.executemany(INSERT_ORDER, rows)
+        return len(rows)
+
+    def syncTrades(self, query, token):
+        # streams the history and skips trades older than the newest stored one, the ticker api has no since
+        # parameter so the body is still downloaded. Trades at the same timestamp are deduplicated by tx hash
+        return self.insertTrades(token, query.iterTrades(token, since=self.lastTradeTime(token), raw=True))
+
+    def syncCandles(self, query, token):
+        return self.insertCandles(token, query.ohlcv(token))
+
+    def syncOrders(self, query, token, contract=None):
+        # with contract, only the book orders of that exchange contract are stored and deactivated
+        book = query.orderbook(token)
+        token = token.lower()
+        rows = self.__orderRows(token, bookOrders(book, BUY) + bookOrders(book, SELL))
+        sql = "UPDATE orders SET active = 0 WHERE chain = ? AND token = ?"
+        args = [self.blockchain, token]
+        if contract is not None:
+            contract = contract.lower()
+            rows = [row for row in rows if row[2] == contract]
+            sql += " AND contract = ?"
+            args.append(contract)
+        # one transaction, readers never see the book with every order inactive
+        with self._lock, self.db:
+            # orders missing from the new snapshot are no longer on the book
+            self.db.execute(sql, args)
+            self.db.executemany(INSERT_ORDER, rows)
+        return len(rows)
+
+    def sync(self, query, token):
+        return {
+            "trades": self.syncTrades(query, token),
+            "candles": self.syncCandles(query, token),
+            "orders": self.syncOrders(query, token)
+        }
+
+# QUERIES
+
+    def __select(self, sql, args):
+        with self._lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def __range(self, since, until):
+        sql = ""
+        args = []
+        if since is not None:
+            sql += " AND ts >= ?"
+            args.append(toTimestamp(since))
+        if until is not None:
+            sql += " AND ts < ?"
+            args.append(toTimestamp(until))
+        return sql, args
+
+    def lastTradeTime(self, token):
+        rows = self.__select("SELECT MAX(ts) FROM trades WHERE chain = ? AND token = ?", (self.blockchain, token.lower()))
+        return rows[0][0]
+
+    def trades(self, token, since=None, until=None, limit=None):
+        where, args = self.__range(since, until)
+        sql = f"SELECT data FROM trades WHERE chain = ? AND token = ?{where} ORDER BY ts"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [json.loads(row["data"]) for row in self.__select(sql, [self.blockchain, token.lower()] + args)]
+
+    def candles(self, token, since=None, until=None):
+        where, args = self.__range(since, until)
+        sql = f"SELECT ts AS time, open, high, low, close, volume FROM candles WHERE chain = ? AND token = ?{where} ORDER BY ts"
+        return [dict(row) for row in self.__select(sql, [self.blockchain, token.lower()] + args)]
+
+    def orders(self, token, order_type=None, active=True, contract=None):
+        sql = "SELECT data FROM orders WHERE chain = ? AND token = ?"
+        args = [self.blockchain, token.lower()]
+        if contract is not None:
+            sql += " AND contract = ?"
+            args.append(contract.lower())
+        if order_type is not None:
+            sql += " AND type = ?"
+            args.append(order_type.upper())
+        if active is not None:
+            sql += " AND active = ?"
+            args.append(int(active))
+        return [json.loads(row["data"]) for row in self.__select(sql + " ORDER BY contract, order_id", args)]
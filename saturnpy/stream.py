@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# Incremental JSON record parser. The response body is scanned chunk by chunk for structural characters,
+# every object inside the selected arrays is cut out and decoded on its own, so only one record is held
+# in memory at a time no matter how long the array is.
+
+import codecs
+import json
+import re
+
+STREAM_CHUNK = 64 * 1024
+STRUCTURE = re.compile(r'[{}\[\],:"\\]')
+STRING = re.compile(r'["\\]')
+
+def iterRecords(chunks, paths=((),)):
+    # chunks: iterable of bytes or str. paths: key paths of the arrays to read, () is a top level array,
+    # ("sell_orders",) is the array under the top level "sell_orders" key
+    paths = set(tuple(p) for p in paths)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    stack = []          # open containers, "{" or "["
+    keys = []           # current key per open container, None for arrays
+    expect_key = False
+    in_string = False
+    escape = False
+    key_parts = None    # text of the key being read
+    capture = None      # stack depth of the record being cut out
+    parts = []
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        if not chunk:
+            continue # nothing decoded yet, keep the pending escape for the next chunk
+        start = 0
+        key_start = 0
+        pos = 0
+        if escape:
+            pos = 1
+            escape = False
+        while True:
+            m = (STRING if in_string else STRUCTURE).search(chunk, pos)
+            if m is None:
+                break
+            i = m.start()
+            c = chunk[i]
+            pos = i + 1
+            if in_string:
+                if c == "\\":
+                    if pos >= len(chunk):
+                        escape = True
+                    pos += 1
+                    continue
+                in_string = False
+                if key_parts is not None:
+                    key_parts.append(chunk[key_start:i])
+                    keys[-1] = "".join(key_parts)
+                    key_parts = None
+            elif c == '"':
+                in_string = True
+                if expect_key:
+                    key_parts = []
+                    key_start = pos
+            elif c == "{" or c == "[":
+                if capture is None and c == "{" and stack and stack[-1] == "[" \
+                        and tuple(k for k in keys[:-1] if k is not None) in paths:
+                    capture = len(stack) + 1
+                    start = i
+                    parts = []
+                stack.append(c)
+                keys.append(None)
+                expect_key = c == "{"
+            elif c == "}" or c == "]":
+                stack.pop()
+                keys.pop()
+                expect_key = False
+                if capture is not None and len(stack) < capture:
+                    parts.append(chunk[start:pos])
+                    capture = None
+                    yield json.loads("".join(parts))
+            elif c == ",":
+                expect_key = bool(stack) and stack[-1] == "{"
+            elif c == ":":
+                expect_key = False
+        if capture is not None:
+            parts.append(chunk[start:])
+        if key_parts is not None:
+            key_parts.append(chunk[key_start:])
+    if stack:
+        raise Exception("ERROR TRUNCATED JSON STREAM")
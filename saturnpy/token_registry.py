@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# Per (chain, address) token metadata cache. Decimals and token standard never change for a
+# deployed token, so each is fetched once and optionally persisted to a json file.
+
+import json
+import os
+import re
+import threading
+
+from web3 import Web3
+
+ERC223_SELECTOR = bytes.fromhex("be45fd62") # transfer(address,uint256,bytes)
+ERC20_SELECTOR = bytes.fromhex("095ea7b3")  # approve(address,uint256)
+DECIMALS_CALLDATA = "0x313ce567"            # decimals()
+SELECTOR_PATTERN = re.compile(re.escape(ERC223_SELECTOR) + b"|" + re.escape(ERC20_SELECTOR))
+
+class TokenRegistry(object):
+    def __init__(self, provider, blockchain, path=None):
+        self.provider: Web3 = provider
+        self.blockchain = blockchain.lower()
+        self.path = path
+        self._tokens = {} # "chain:address" -> {"erc223": bool, "erc20": bool, "decimals": int}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path) as x:
+                self._tokens = json.load(x)
+
+    def key(self, address):
+        return f"{self.blockchain}:{address.lower()}"
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            data = json.dumps(self._tokens, indent=1, sort_keys=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as x:
+            x.write(data)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        with self._lock:
+            self._tokens = {}
+
+    def __entry(self, address):
+        key = self.key(address)
+        entry = self._tokens.get(key)
+        if entry is None:
+            entry = self._tokens.setdefault(key, {})
+        return entry
+
+    def __update(self, address, values):
+        with self._lock:
+            self.__entry(address).update(values)
+        self.save()
+
+    def __codeFlags(self, address):
+        entry = self.__entry(address)
+        if "erc223" not in entry:
+            code = bytes(self.provider.eth.getCode(self.provider.toChecksumAddress(address)))
+            if not code:
+                # nothing deployed (yet, or on this node), not remembered
+                return {"erc223": False, "erc20": False}
+            found = set(SELECTOR_PATTERN.findall(code))
+            self.__update(address, {
+                "erc223": ERC223_SELECTOR in found,
+                "erc20": ERC20_SELECTOR in found
+            })
+        return entry
+
+    def isERC223(self, address):
+        return self.__codeFlags(address)["erc223"]
+
+    def isERC20(self, address):
+        return self.__codeFlags(address)["erc20"]
+
+    def tokenType(self, address):
+        entry = self.__codeFlags(address)
+        if entry["erc223"]:
+            return "ERC223"
+        if entry["erc20"]:
+            return "ERC20"
+        raise Exception(f'Token {self.provider.toChecksumAddress(address)} on ${self.blockchain.upper()} is of unknown type')
+
+    def decimals(self, address):
+        entry = self.__entry(address)
+        if "decimals" not in entry:
+            result = bytes(self.provider.eth.call({
+                "to": self.provider.toChecksumAddress(address),
+                "data": DECIMALS_CALLDATA
+            }))
+            # an address without code, or without decimals(), answers with no data
+            if len(result) < 32:
+                raise Exception(f'Token {self.provider.toChecksumAddress(address)} on ${self.blockchain.upper()} returned no decimals')
+            self.__update(address, {"decimals": int.from_bytes(result[:32], byteorder="big")})
+        return entry["decimals"]
+
+    def expDecimals(self, address):
+        return 10 ** self.decimals(address)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+# Handle for a group of broadcast transactions, returned by ExchangeInterface.newOrders / cancelOrders.
+
+from web3 import Web3
+
+class TxBatch(object):
+    def __init__(self, provider, watcher, txhashes, errors=None):
+        self.provider: Web3 = provider
+        self.watcher = watcher
+        self.txhashes = list(txhashes)
+        self.errors = errors or {} # index in the request -> exception, for transactions that were not broadcast
+
+    def __len__(self):
+        return len(self.txhashes)
+
+    def __iter__(self):
+        return iter(self.txhashes)
+
+    def __getitem__(self, i):
+        return self.txhashes[i]
+
+    def ok(self):
+        return not self.errors
+
+    def wait(self, timeout=120):
+        # receipts in request order, None for transactions that were not broadcast
+        pending = [tx for tx in self.txhashes if tx not in (None, '0x')] # '0x' is a test mode placeholder
+        receipts = dict(zip(pending, self.watcher.waitAll(pending, timeout)))
+        return [receipts.get(tx) for tx in self.txhashes]
+
+    def futures(self, timeout=120):
+        # concurrent.futures.Future per broadcast transaction, resolved as each one is mined
+        return [self.watcher.watch(tx, timeout) for tx in self.txhashes if tx not in (None, '0x')]
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+# Transaction pipeline. Calldata is encoded from cached per function templates (selector and argument
+# types looked up once), signing runs on a thread or process pool, and signed transactions go through a
+# bounded queue to one broadcast thread that sends whatever is queued as a single JSON-RPC batch.
+
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import repeat
+
+from eth_abi import encode_abi
+from eth_account import Account
+from eth_utils import function_abi_to_4byte_selector, decode_hex, encode_hex, keccak
+
+from .batch import RpcBatch
+
+SIGN_WORKERS = 4
+QUEUE_SIZE = 256        # signed transactions waiting for broadcast, submit blocks when full
+BROADCAST_BATCH = 32    # max transactions per eth_sendRawTransaction batch
+
+class ContractCall(object):
+    # encoded call, used by ExchangeInterface.buildTx in place of a web3 ContractFunction
+    __slots__ = ("to", "data")
+
+    def __init__(self, to, data):
+        self.to = to
+        self.data = data
+
+class CallTemplates(object):
+    # calldata encoder for one abi, template per (function name, argument count)
+    def __init__(self, abi):
+        self.abi = abi
+        self._templates = {}
+
+    def template(self, fn_name, nargs):
+        key = (fn_name, nargs)
+        template = self._templates.get(key)
+        if template is None:
+            for fn in self.abi:
+                if fn.get("type") == "function" and fn.get("name") == fn_name and len(fn["inputs"]) == nargs:
+                    types = [i["type"] for i in fn["inputs"]]
+                    template = self._templates[key] = (function_abi_to_4byte_selector(fn), types)
+                    break
+            else:
+                raise Exception(f'Unknown contract function {fn_name} with {nargs} arguments')
+        return template
+
+    def encode(self, fn_name, *args):
+        selector, types = self.template(fn_name, len(args))
+        # web3 accepts hex strings for bytes arguments, eth_abi only bytes
+        args = [decode_hex(a) if t.startswith("bytes") and isinstance(a, str) else a for t, a in zip(types, args)]
+        return encode_hex(selector + encode_abi(types, args))
+
+    def call(self, to, fn_name, *args):
+        return ContractCall(to, self.encode(fn_name, *args))
+
+def signTx(unsigned_tx, key):
+    # module level so it can run in a process pool
+    raw_tx = bytes(Account.signTransaction(unsigned_tx, key).rawTransaction)
+    return raw_tx, encode_hex(keccak(raw_tx))
+
+class TxPipeline(object):
+    def __init__(self, provider, wallet, session=None, timeout=None, workers=SIGN_WORKERS, processes=False,
+                 queue_size=QUEUE_SIZE, batch_size=BROADCAST_BATCH):
+        self.provider = provider
+        self.wallet = wallet
+        self.session = session
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.workers = workers
+        self.executor = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(workers)
+        self.queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def sign(self, unsigned_txs, wallet=None):
+        # (raw transaction, txhash) per transaction, in order. wallet defaults to the pipeline wallet, accounts
+        # of an AccountPool pass their own and share one pool and broadcast thread
+        if wallet is None:
+            wallet = self.wallet
+        # chunksize only matters for the process pool, it sends each worker one slice instead of one tx per round trip
+        chunksize = max(1, len(unsigned_txs) // self.workers)
+        return list(self.executor.map(signTx, unsigned_txs, repeat(wallet.privateKey), chunksize=chunksize))
+
+    def submit(self, unsigned_txs, wallet=None):
+        # signs all transactions on the pool, queues them in nonce order and returns a Future per transaction
+        # that resolves to the txhash once the node accepted it
+        self.__start()
+        futures = []
+        for raw_tx, txhash in self.sign(unsigned_txs, wallet):
+            future = Future()
+            future.txhash = txhash
+            self.queue.put((raw_tx, txhash, future))
+            futures.append(future)
+        return futures
+
+    def __start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.__broadcast, name="saturnpy-broadcast", daemon=True)
+                self._thread.start()
+
+    def __broadcast(self):
+        while True:
+            items = [self.queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in items
+            items = [item for item in items if item is not None]
+            if items:
+                self.__send(items)
+            if stop:
+                return
+
+    def __send(self, items):
+        batch = RpcBatch(self.provider, self.session, self.timeout)
+        for raw_tx, _, _ in items:
+            batch.sendRawTransaction(raw_tx)
+        try:
+            results = batch.execute(raise_errors=False)
+        except Exception as e:
+            results = [e] * len(items)
+        for (_, txhash, future), result in zip(items, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(txhash)
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join()
+        self.executor.shutdown()
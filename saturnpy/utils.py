@@ -2,12 +2,14 @@
 
 # PseudoDeterminist, [06.09.2019]
 
+import json
+from functools import lru_cache
 from decimal import Decimal, getcontext
-from fractions import Fraction
-from eth_utils import decode_hex, event_abi_to_log_topic
+from eth_utils import decode_hex, event_abi_to_log_topic, to_checksum_address
 from web3._utils.abi import filter_by_type
 from web3._utils.events import get_event_data
-from ethereum.utils import encode_int, encode_hex
+# amount and price helpers, integer implementations in fixed.py
+from .fixed import toFixed, mentDecimal, toSbtkn, toTkn, intVerify, nearestTrade
 
 
 getcontext().prec = 100  # Set Decimal Precision good enough for eth Uint256
@@ -18,6 +20,11 @@ exp_ether_decimals = 1000000000000000000 # 10 ** 18
 etheraddress = "0x0000000000000000000000000000000000000000"
 gaslimit = 400000
 
+# checksummed address, cached since the same few addresses are converted on every call
+@lru_cache(maxsize=4096)
+def checksum(address):
+    return to_checksum_address(address)
+
 # Get rid of leading and trailing zeroes in internal representation of d
 # decimal.py does not have, but can use, this function
 
@@ -30,118 +37,82 @@ def trunc(d):
 def shiftedBy(d, e):
     return trunc(Decimal(d).scaleb(e)) # scaleb() can leave extra padded 0's
 
-# decimal.py really needs this! return regular fixed notation string. str(d) is mixed.
-
-def toFixed(d):
-    td = trunc(Decimal(d))
-
-    if (td == 0):
-        return "0"
-
-    dtuple   = td.as_tuple()
-    dsign    = dtuple[0]
-    ddigits  = dtuple[1]
-    dlength  = len(ddigits)
-    dexpt    = dtuple[2]
-    dindex   = 0
-    point   = "."
-
-    if (dsign):
-        dstr = "-"
-    else:
-        dstr = ""
-
-    if (dexpt <= -dlength):
-        dstr  += "0."
-        point  = ""
-
-    while (dexpt < -dlength):
-        dstr  += "0"
-        dexpt += 1
-
-    while (dlength > -dexpt):
-        if (dlength > 0):
-            dstr += str(ddigits[dindex])
-        else:
-            dstr += "0"
-
-        dindex  += 1
-        dlength -= 1
-
-    if (dlength > 1):
-        dstr += point
-
-    while (dlength > 0):
-        dstr    += str(ddigits[dindex])
-        dindex  += 1
-        dlength -= 1
-
-    return dstr
-
-# Increment decimal by i shifted 1 past last significant place
-
-def mentDecimal(d, i=0):
-    d = trunc(Decimal(d))
+def toUint(num):
+    from ethereum.utils import encode_int, encode_hex # the ethereum package takes half a second to import
+    return encode_hex(encode_int(num)).rjust(64, '0')
 
-    da = d.adjusted()
-    dshifted = shiftedBy(d, -da)
-    ishifted = shiftedBy(i, -len(dshifted.as_tuple()[1]))
+# topic -> event abi lookup tables, keyed by abi content so equal custom abis passed as fresh objects share
+# one table. Only the last TOPIC_INDEX_SIZE abis are kept, and no abi object is referenced.
 
-    return shiftedBy(dshifted + ishifted, da)
+TOPIC_INDEX_SIZE = 64
 
-# convert ERC token units to subunits and back, with error checking
+@lru_cache(maxsize=TOPIC_INDEX_SIZE)
+def _topicIndex(abi_json):
+    abi = json.loads(abi_json)
+    return {event_abi_to_log_topic(event_abi): event_abi for event_abi in filter_by_type("event", abi)}
 
-def toSbtkn(tknAmt, expDecimals, STRICT = True):
-    return intVerify(Fraction(tknAmt) * expDecimals, STRICT = STRICT)
+def topicIndex(abi):
+    return _topicIndex(json.dumps(abi, sort_keys=True))
 
-def toTkn(sbtknAmt, expDecimals, STRICT = True):
-    sbtknAmt = intVerify(sbtknAmt, STRICT)
-    return Fraction(sbtknAmt) / expDecimals
+# get_event_data compares topics as bytes, logs with hex string or int topics are decoded from a copy
 
-def intVerify (amount, STRICT = True):
-    amount = Fraction(amount)
-    if STRICT:
-        assert amount == int(amount), f'amount {amount} must be integer value'
-    return int(amount)
+def topicBytes(topic):
+    if isinstance(topic, str):
+        return decode_hex(topic)
+    if isinstance(topic, int):
+        return topic.to_bytes(32, "big")
+    return topic
 
-def toUint(num):
-    return encode_hex(encode_int(num)).rjust(64, '0')
+def bytesTopics(log):
+    topics = log["topics"]
+    if all(isinstance(topic, bytes) for topic in topics):
+        return log
+    return dict(log, topics=[topicBytes(topic) for topic in topics])
 
 class AbiDecoder(object):
     def __init__(self, provider, abi):
         self.provider = provider
         self.abi = abi
+        self.topic_index = topicIndex(abi)
 
-    def __decode_event(self, log, abi):
-        if isinstance(log["topics"][0], str):
-            log["topics"][0] = decode_hex(log["topics"][0])
-        elif isinstance(log["topics"][0], int):
-            log["topics"][0] = decode_hex(hex(log["topics"][0]))
-        event_id = log["topics"][0]
-        events = filter_by_type("event", abi)
-        topic_to_event_abi = {event_abi_to_log_topic(event_abi): event_abi for event_abi in events}
-        event_abi = topic_to_event_abi[event_id]
+    def __topic_index(self, customAbi):
+        if customAbi is None:
+            return self.topic_index
+        return topicIndex(customAbi)
+
+    def __decode_event(self, log, topic_index):
+        log = bytesTopics(log)
+        event_abi = topic_index[log["topics"][0]]
         return get_event_data(event_abi, log)
 
-    def allEvents(self,txhash : str, customAbi = None):
-        useAbi = self.abi
-        if customAbi != None:
-            useAbi = customAbi
+    def decodeEvent(self, log, customAbi = None):
+        return self.__decode_event(log, self.__topic_index(customAbi))
+
+    def decodeLogs(self, logs, customAbi = None):
+        # logs with unknown or missing topics are skipped
+        topic_index = self.__topic_index(customAbi)
+        decoded = []
+        for log in logs:
+            if not log["topics"]:
+                continue
+            log = bytesTopics(log)
+            event_abi = topic_index.get(log["topics"][0])
+            if event_abi is None:
+                continue
+            try:
+                decoded.append(get_event_data(event_abi, log))
+            except Exception:
+                pass # same signature, different indexed layout
+        return decoded
 
+    def allEvents(self,txhash : str, customAbi = None):
         receipt = self.provider.eth.getTransactionReceipt(txhash)
-        foundEvents = []
-        errors = []
-        for eventlog in receipt.logs:
-            try:
-                decoded = self.__decode_event(eventlog, useAbi)
-                foundEvents.append(decoded)
-            except Exception as e:
-                errors.append(e)
-                #pass
-        return foundEvents
+        return self.decodeLogs(receipt.logs, customAbi)
 
     def getIntegerPrice(self, txhash):
-        decoded_event_data = self.allEvents(txhash)
+        return self.integerPrice(self.allEvents(txhash))
+
+    def integerPrice(self, decoded_event_data):
         price = {}
         for event in decoded_event_data:
             _args = event["args"]
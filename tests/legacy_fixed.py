@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# The Decimal / Fraction amount helpers of saturnpy.utils before saturnpy.fixed replaced them, copied as they
+# were. Reference for tests/test_fixed.py and the timings in benchmarks/fixed_point.py.
+
+from decimal import Decimal, getcontext
+from fractions import Fraction
+
+getcontext().prec = 100 # as set by saturnpy.utils
+
+# the old helpers
+
+def legacyTrunc(d):
+    da = d.adjusted()
+    return Decimal(d).scaleb(-da).normalize().scaleb(da)
+
+def legacyShiftedBy(d, e):
+    return legacyTrunc(Decimal(d).scaleb(e))
+
+def legacyToFixed(d):
+    td = legacyTrunc(Decimal(d))
+    if (td == 0):
+        return "0"
+    dsign, ddigits, dexpt = td.as_tuple()
+    dlength = len(ddigits)
+    dindex = 0
+    point = "."
+    dstr = "-" if dsign else ""
+    if (dexpt <= -dlength):
+        dstr += "0."
+        point = ""
+    while (dexpt < -dlength):
+        dstr += "0"
+        dexpt += 1
+    while (dlength > -dexpt):
+        dstr += str(ddigits[dindex]) if dlength > 0 else "0"
+        dindex += 1
+        dlength -= 1
+    if (dlength > 1):
+        dstr += point
+    while (dlength > 0):
+        dstr += str(ddigits[dindex])
+        dindex += 1
+        dlength -= 1
+    return dstr
+
+def legacyMentDecimal(d, i=0):
+    d = legacyTrunc(Decimal(d))
+    da = d.adjusted()
+    dshifted = legacyShiftedBy(d, -da)
+    ishifted = legacyShiftedBy(i, -len(dshifted.as_tuple()[1]))
+    return legacyShiftedBy(dshifted + ishifted, da)
+
+def legacyIntVerify(amount, STRICT=True):
+    amount = Fraction(amount)
+    if STRICT:
+        assert amount == int(amount), f'amount {amount} must be integer value'
+    return int(amount)
+
+def legacyToSbtkn(tknAmt, expDecimals, STRICT=True):
+    return legacyIntVerify(Fraction(tknAmt) * expDecimals, STRICT=STRICT)
+
+# random inputs
+
+def decimalString(rnd):
+    whole = "".join(rnd.choice("0123456789") for _ in range(rnd.randint(0, 25)))
+    frac = "".join(rnd.choice("0123456789") for _ in range(rnd.randint(0, 25)))
+    if rnd.random() < 0.3:
+        frac += "0" * rnd.randint(1, 5)
+    if not whole and not frac:
+        whole = "0"
+    s = rnd.choice(("", "", "-", "+")) + whole
+    if frac or rnd.random() < 0.2:
+        s += "." + frac
+    if rnd.random() < 0.2:
+        s += rnd.choice("eE") + str(rnd.randint(-30, 30))
+    return s
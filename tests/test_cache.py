@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+# TTLCache expiry and LRU eviction, with a fake clock.
+
+import pytest
+
+from saturnpy import cache as cache_module
+from saturnpy.cache import TTLCache
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = TTLCache()
+    cache.set("ticker", 1, ttl=5)
+    cache.set("forever", 2)
+    clock.now += 4.9
+    assert cache.get("ticker") == 1
+    clock.now += 0.1
+    assert cache.get("ticker") is None
+    assert "ticker" not in cache
+    clock.now += 10 ** 6
+    assert cache.get("forever") == 2
+    assert len(cache) == 1
+    assert cache.stats() == {"hits": 2, "misses": 1, "size": 1, "maxsize": 1024}
+
+def test_set_renews_the_ttl(clock):
+    cache = TTLCache()
+    cache.set("ticker", 1, ttl=5)
+    clock.now += 4
+    cache.set("ticker", 2, ttl=5)
+    clock.now += 4
+    assert cache.get("ticker") == 2
+
+def test_least_recently_used_is_evicted(clock):
+    cache = TTLCache(maxsize=3)
+    for k in "abc":
+        cache.set(k, k)
+    assert cache.get("a") == "a" # a is now the most recent
+    cache.set("d", "d")
+    assert "b" not in cache
+    assert [k for k in "acd" if k in cache] == ["a", "c", "d"]
+    cache.set("c", "C") # overwriting also counts as a use
+    cache.set("e", "e")
+    assert "a" not in cache
+    assert len(cache) == 3
+
+def test_invalidate():
+    cache = TTLCache()
+    for k in (("ticker", 1), ("ticker", 2), ("ohlcv", 1)):
+        cache.set(k, k)
+    cache.invalidate(("ohlcv", 1))
+    cache.invalidateWhere(lambda k: k[1] == 2)
+    assert ("ticker", 1) in cache
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
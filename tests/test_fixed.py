@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# saturnpy.fixed must give the same results as the Decimal / Fraction helpers utils used before, which are
+# kept in tests/legacy_fixed.py. Property based with hypothesis, plus a seeded random sweep.
+# Run from the repository root: python -m pytest -q tests
+
+import random
+from decimal import Decimal, getcontext
+from fractions import Fraction
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from saturnpy import fixed
+from tests.legacy_fixed import legacyToFixed, legacyMentDecimal, legacyIntVerify, legacyToSbtkn, decimalString
+
+CASES = 2000
+SEED = 20200101
+
+def outcome(fn, *args):
+    try:
+        return fn(*args)
+    except AssertionError:
+        return AssertionError
+
+def checkToFixed(x):
+    new, old = fixed.toFixed(x), legacyToFixed(x)
+    assert Decimal(new) == Decimal(x)
+    # the old toFixed dropped the point of numbers >= 1 with exactly one fractional digit: "1.5" -> "15"
+    whole, _, frac = new.lstrip("-").partition(".")
+    if len(frac) == 1 and whole != "0":
+        new = new.replace(".", "")
+    assert new == old
+
+def checkMentDecimal(x, i):
+    new = fixed.mentDecimal(x, i)
+    if len(new.as_tuple()[1]) > 100:
+        # exact, the old version rounded to the 100 digit context precision
+        new = getcontext().plus(new)
+    assert new == legacyMentDecimal(x, i)
+
+def checkRational(y, exp_decimals):
+    for strict in (True, False):
+        assert outcome(fixed.intVerify, y, strict) == outcome(legacyIntVerify, y, strict)
+        assert outcome(fixed.toSbtkn, y, exp_decimals, strict) == outcome(legacyToSbtkn, y, exp_decimals, strict)
+    assert fixed.scaledPrice(y, 10 ** 18, exp_decimals) == (Fraction(y) * 10 ** 18 / exp_decimals).as_integer_ratio()
+
+# seeded random inputs
+
+def number(rnd):
+    kind = rnd.random()
+    s = decimalString(rnd)
+    if kind < 0.6:
+        return s
+    if kind < 0.8:
+        return Decimal(s)
+    return int(Decimal(s))
+
+def rational(rnd):
+    kind = rnd.random()
+    if kind < 0.7:
+        return number(rnd)
+    if kind < 0.8:
+        return rnd.uniform(-1e6, 1e6)
+    if kind < 0.9:
+        return Fraction(rnd.randint(-10 ** 12, 10 ** 12), 2 ** rnd.randint(0, 8) * 5 ** rnd.randint(0, 8))
+    return Fraction(rnd.randint(-10 ** 12, 10 ** 12), rnd.randint(1, 10 ** 6))
+
+def test_random_equivalence():
+    rnd = random.Random(SEED)
+    for _ in range(CASES):
+        x = number(rnd)
+        checkToFixed(x)
+        checkMentDecimal(x, rnd.choice((0, 1, -1, rnd.randint(-99, 99), decimalString(rnd))))
+        checkRational(rational(rnd), 10 ** rnd.randint(0, 18))
+
+def test_known_values():
+    assert fixed.toFixed("1E-5") == "0.00001"
+    assert fixed.toFixed(Decimal("1.2E5")) == "120000"
+    assert fixed.toFixed("-1.50") == "-1.5"
+    assert fixed.mentDecimal("12.3", 1) == Decimal("12.31")
+    assert fixed.mentDecimal("0.00", 1) == Decimal("0.001")
+    assert fixed.toSbtkn("1.5", 10 ** 18) == 15 * 10 ** 17
+    assert fixed.toTkn(15 * 10 ** 17, 10 ** 18) == Fraction(3, 2)
+    with pytest.raises(AssertionError):
+        fixed.toSbtkn("0.1", 1)
+    assert fixed.nearestTrade(1005, "SELL", 10, 3, 2000) == 1000
+    assert fixed.nearestTrade(1005, "BUY", 10, 3, 200) == 60
+
+# hypothesis
+
+digits = st.text("0123456789", max_size=25)
+
+@st.composite
+def decimalStrings(draw):
+    whole, frac = draw(digits), draw(digits)
+    if not whole and not frac:
+        whole = "0"
+    s = draw(st.sampled_from(("", "-", "+"))) + whole
+    if frac or draw(st.booleans()):
+        s += "." + frac
+    if draw(st.booleans()):
+        s += draw(st.sampled_from("eE")) + str(draw(st.integers(-30, 30)))
+    return s
+
+numbers = st.one_of(
+    decimalStrings(),
+    decimalStrings().map(Decimal),
+    decimalStrings().map(lambda s: int(Decimal(s)))
+)
+rationals = st.one_of(
+    numbers,
+    st.floats(-1e6, 1e6, allow_nan=False),
+    st.fractions(max_denominator=10 ** 6).filter(lambda f: abs(f) < 10 ** 12)
+)
+increments = st.one_of(st.integers(-99, 99), decimalStrings())
+
+@settings(max_examples=500, deadline=None)
+@given(numbers)
+def test_toFixed(x):
+    checkToFixed(x)
+
+@settings(max_examples=500, deadline=None)
+@given(numbers, increments)
+def test_mentDecimal(x, i):
+    checkMentDecimal(x, i)
+
+@settings(max_examples=500, deadline=None)
+@given(rationals, st.integers(0, 18))
+def test_rational(y, decimals):
+    checkRational(y, 10 ** decimals)
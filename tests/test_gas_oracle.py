@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# GasOracle with stub strategies, no network.
+
+import threading
+import time
+
+import pytest
+
+from saturnpy.gas_oracle import GasOracle
+
+class Strategy(object):
+    def __init__(self, value=None, gate=None):
+        self.value = value
+        self.gate = gate
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.value is None:
+            raise Exception("GAS STATION DOWN")
+        return self.value
+
+def settle(oracle):
+    # lets a background refresh finish
+    for _ in range(500):
+        if not oracle._refreshing:
+            return
+        time.sleep(0.001)
+
+def test_first_price_does_not_wait_on_the_strategy():
+    gate = threading.Event()
+    station = Strategy(30, gate)
+    oracle = GasOracle([station], ttl=60, fallback=10)
+    start = time.monotonic()
+    assert oracle.price() == 10
+    assert time.monotonic() - start < 1
+    gate.set()
+    settle(oracle)
+    assert oracle.price() == 30
+
+def test_failing_strategy_is_tried_once_per_ttl():
+    station = Strategy()
+    oracle = GasOracle([station], ttl=60, fallback=10)
+    for _ in range(50):
+        assert oracle.price() == 10
+        settle(oracle)
+    assert station.calls == 1
+
+def test_callable_fallback_is_read_once():
+    rpc = Strategy(20)
+    oracle = GasOracle([Strategy()], ttl=60, fallback=rpc)
+    assert [oracle.price() for _ in range(10)] == [20] * 10
+    settle(oracle)
+    assert rpc.calls == 1
+
+def test_stale_value_is_returned_while_refreshing():
+    station = Strategy(30)
+    oracle = GasOracle([station], ttl=0.01, fallback=10)
+    assert oracle.refresh() == 30
+    station.value = 40
+    station.gate = threading.Event()
+    time.sleep(0.02)
+    assert oracle.price() == 30
+    station.gate.set()
+    settle(oracle)
+    assert oracle.price() == 40
+
+def test_without_fallback_the_first_lookup_blocks():
+    oracle = GasOracle([Strategy()], ttl=60)
+    with pytest.raises(Exception, match="NO GAS PRICE AVAILABLE"):
+        oracle.price()
+    assert GasOracle([Strategy(5)], ttl=60).price() == 5
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+
+# Names importable from the package since before the lazy imports, and that importing it stays light.
+
+import subprocess
+import sys
+
+def test_public_names():
+    from saturnpy import Saturn, AsyncSaturn, RequestManager, ExchangeInterface, mnemonic_to_private_key
+    from saturnpy import Account, Web3, HTTPProvider, IPCProvider, WebsocketProvider
+    from saturnpy.exchange import ExchangeInterface as exchange_interface
+    assert ExchangeInterface is exchange_interface
+    assert callable(mnemonic_to_private_key) and Saturn.__name__ == "Saturn"
+
+def test_import_is_lazy():
+    code = "import sys, saturnpy; print(any(m in sys.modules for m in ('web3', 'eth_account', 'pandas')))"
+    assert subprocess.check_output([sys.executable, "-c", code]).strip() == b"False"
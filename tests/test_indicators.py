@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# Wilder RSI / ATR against a plain textbook implementation and known reference values.
+
+import json
+import math
+
+import pandas as pd
+import pytest
+
+from saturnpy.indicators import RSI_PERIODS, ATR_PERIODS, ohlcvFrame, rsi, atr, indicatorFrame, IndicatorState
+
+FIXTURE = "benchmarks/fixtures/ohlcv.json"
+
+# closes of the StockCharts RSI example, values computed without rounding the averages
+CLOSES = [
+    44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08, 45.89, 46.03, 45.61, 46.28,
+    46.28, 46.00, 46.03, 46.41, 46.22, 45.64, 46.21, 46.25, 45.71, 46.45, 45.78, 45.35, 44.03, 44.18,
+    44.22, 44.57, 43.42, 42.66, 43.13
+]
+RSI_VALUES = [
+    70.46, 66.25, 66.48, 69.35, 66.29, 57.92, 62.88, 63.21, 56.01, 62.34, 54.67, 50.39, 40.02, 41.49,
+    41.9, 45.5, 37.32, 33.09, 37.79
+]
+
+def frame():
+    with open(FIXTURE) as f:
+        return ohlcvFrame(json.load(f))
+
+def textbookWilder(values, periods):
+    # simple average of the first periods values, then avg = (avg * (periods - 1) + x) / periods
+    out = [math.nan] * (periods - 1)
+    avg = sum(values[:periods]) / periods
+    out.append(avg)
+    for x in values[periods:]:
+        avg = (avg * (periods - 1) + x) / periods
+        out.append(avg)
+    return out
+
+def textbookRsi(closes, periods=RSI_PERIODS):
+    changes = [b - a for a, b in zip(closes, closes[1:])]
+    gains = textbookWilder([max(c, 0) for c in changes], periods)
+    losses = textbookWilder([max(-c, 0) for c in changes], periods)
+    return [math.nan] + [100.0 if l == 0 else 100 - 100 / (1 + g / l) for g, l in zip(gains, losses)]
+
+def test_rsi_known_values():
+    out = rsi(pd.Series(CLOSES))
+    assert out.iloc[:RSI_PERIODS].isna().all()
+    assert out.iloc[RSI_PERIODS:].round(2).tolist() == RSI_VALUES
+
+def test_rsi_matches_textbook():
+    closes = frame()["close"]
+    out = rsi(closes)
+    assert round(out.iloc[14], 2) == 67.56
+    assert round(out.iloc[20], 2) == 53.73
+    expected = textbookRsi(closes.tolist())
+    assert out.iloc[RSI_PERIODS:].tolist() == pytest.approx(expected[RSI_PERIODS:], abs=1e-9)
+
+def test_atr_matches_textbook():
+    f = frame()
+    high, low, close = f["high"].tolist(), f["low"].tolist(), f["close"].tolist()
+    ranges = [high[0] - low[0]] + [
+        max(h - l, abs(h - c), abs(l - c)) for h, l, c in zip(high[1:], low[1:], close)
+    ]
+    out = atr(f)
+    assert out.iloc[:ATR_PERIODS - 1].isna().all()
+    assert out.iloc[ATR_PERIODS - 1:].tolist() == pytest.approx(textbookWilder(ranges, ATR_PERIODS)[ATR_PERIODS - 1:], abs=1e-9)
+
+def test_state_update_matches_recompute():
+    f = frame()
+    state = IndicatorState(f.iloc[:-20])
+    for i in range(len(f) - 20, len(f)):
+        latest = state.update(f.iloc[i])
+    full = indicatorFrame(f).iloc[-1]
+    assert latest["rsi"] == pytest.approx(full["rsi"], abs=1e-9)
+    assert latest["atr"] == pytest.approx(full["atr"], abs=1e-9)
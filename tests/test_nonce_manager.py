@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+# NonceManager against a stub provider, no network.
+
+from saturnpy.nonce_manager import NonceManager
+
+ADDRESS = "0x5ef83ab1155786f146c5a00722bef7ab683dc0de"
+
+class Eth(object):
+    def __init__(self, count):
+        self.count = count
+        self.calls = 0
+
+    def getTransactionCount(self, address, block):
+        assert block == "pending"
+        self.calls += 1
+        return self.count
+
+class Provider(object):
+    def __init__(self, count):
+        self.eth = Eth(count)
+
+    def toChecksumAddress(self, address):
+        return address
+
+def test_synced_once_then_local():
+    provider = Provider(7)
+    nonces = NonceManager(provider, ADDRESS)
+    assert [nonces.next(), nonces.next()] == [7, 8]
+    assert nonces.reserve(3) == [9, 10, 11]
+    assert nonces.next() == 12
+    assert provider.eth.calls == 1
+
+def test_release_of_the_last_nonce_reuses_it():
+    provider = Provider(7)
+    nonces = NonceManager(provider, ADDRESS)
+    nonces.release(7) # nothing handed out yet
+    assert nonces.next() == 7
+    nonces.release(7)
+    assert nonces.next() == 7
+    assert provider.eth.calls == 1
+
+def test_release_leaving_a_gap_resyncs():
+    provider = Provider(7)
+    nonces = NonceManager(provider, ADDRESS)
+    assert nonces.reserve(3) == [7, 8, 9]
+    nonces.release(8)
+    provider.eth.count = 8 # only 7 reached the node
+    assert nonces.next() == 8
+    assert provider.eth.calls == 2
+    nonces.release(100) # never handed out, ignored
+    assert nonces.next() == 9
+    assert provider.eth.calls == 2
+
+def test_reset_and_resync():
+    provider = Provider(7)
+    nonces = NonceManager(provider, ADDRESS)
+    nonces.next()
+    nonces.reset()
+    provider.eth.count = 20
+    assert nonces.next() == 20
+    provider.eth.count = 30
+    assert nonces.resync() == 30
+    assert nonces.next() == 30
+    assert provider.eth.calls == 3
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+# OrderBook depth against a brute force sum over random incremental updates.
+
+import random
+from fractions import Fraction
+
+from saturnpy.orderbook import OrderBook, BUY, SELL
+
+def bruteDepth(book, order_type, price):
+    better = (lambda p: p >= price) if order_type == BUY else (lambda p: p <= price)
+    return sum((amount for t, p, amount in book.orders.values() if t == order_type and better(p)), Fraction(0))
+
+def test_depth_matches_brute_force():
+    rnd = random.Random(4)
+    book = OrderBook()
+    for step in range(3000):
+        action = rnd.random()
+        if action < 0.5 or not book.orders:
+            order_type = rnd.choice((BUY, SELL))
+            price = Fraction(rnd.randint(1, 60), 1000)
+            book.updateOrder(rnd.randint(1, 300), order_type, price, Fraction(rnd.randint(1, 10 ** 6), 10 ** 4))
+        elif action < 0.8:
+            order_id = rnd.choice(list(book.orders))
+            book.fillOrder(order_id, book.orders[order_id][2] / rnd.choice((1, 2, 3)))
+        else:
+            book.cancelOrder(rnd.choice(list(book.orders)))
+        if step % 7 == 0:
+            for order_type in (BUY, SELL):
+                price = Fraction(rnd.randint(0, 61), 1000)
+                assert book.depth(order_type, price) == bruteDepth(book, order_type, price)
+
+def test_depth_and_levels():
+    book = OrderBook.fromJson({
+        "buys": [
+            {"order_id": 1, "type": "BUY", "price": "0.0002", "balance": "10"},
+            {"order_id": 2, "type": "BUY", "price": "0.0001", "balance": "5"},
+            {"order_id": 3, "type": "BUY", "price": "0.0002", "balance": "1"}
+        ],
+        "sells": [
+            {"order_id": 4, "type": "SELL", "price": "0.0003", "balance": "7"},
+            {"order_id": 5, "type": "SELL", "price": "0.0004", "balance": "2"}
+        ]
+    })
+    assert book.bestBid() == Fraction("0.0002") and book.bestAsk() == Fraction("0.0003")
+    assert book.depth(BUY, "0.0002") == 11
+    assert book.depth(BUY, "0.0001") == 16
+    assert book.depth(SELL, "0.0003") == 7
+    assert book.depth(SELL, "0.001") == 9
+    assert book.depth(SELL, "0.0001") == 0
+    book.fillOrder(1, 4)
+    assert book.depth(BUY, "0.0001") == 12
+    book.cancelOrder(3)
+    book.cancelOrder(1)
+    assert book.levels(BUY) == [(Fraction("0.0001"), 5)]
+    assert book.depth(BUY, "0.0001") == 5
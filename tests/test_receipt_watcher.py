@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+# ReceiptWatcher against a stub provider without a session, so receipts are fetched one call at a time
+# through provider.manager. No network.
+
+import threading
+import time
+
+import pytest
+
+from saturnpy.receipt_watcher import ReceiptWatcher
+
+MINED = "0x" + "ab" * 32
+PENDING = "0x" + "22" * 32
+BLOCK_HASH = "0x" + "33" * 32
+
+class Manager(object):
+    def __init__(self):
+        self.receipts = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def request_blocking(self, method, params):
+        assert method == "eth_getTransactionReceipt"
+        with self.lock:
+            self.requests += 1
+            return self.receipts.get(params[0])
+
+class Eth(object):
+    def __init__(self):
+        self.blockNumber = 1
+
+class Provider(object):
+    def __init__(self):
+        self.provider = object()
+        self.manager = Manager()
+        self.eth = Eth()
+
+def receipt(txhash):
+    return {"transactionHash": txhash, "blockHash": BLOCK_HASH, "blockNumber": "0x5", "status": "0x1"}
+
+def test_mined_receipt_resolves_the_future():
+    provider = Provider()
+    watcher = ReceiptWatcher(provider, poll_interval=0.01)
+    future = watcher.watch("0x" + "AB" * 32, timeout=5) # hashes are matched lower case
+    time.sleep(0.05)
+    assert not future.done()
+    provider.manager.receipts[MINED] = receipt(MINED)
+    provider.eth.blockNumber = 2
+    result = future.result(5)
+    assert result.blockNumber == 5
+    assert result.status == 1
+    assert watcher.pending == {}
+
+def test_unmined_transaction_times_out():
+    provider = Provider()
+    watcher = ReceiptWatcher(provider, poll_interval=0.01)
+    start = time.monotonic()
+    future = watcher.watch(PENDING, timeout=0.1)
+    with pytest.raises(Exception, match="TIMEOUT AWAITING RECEIPT"):
+        future.result(5)
+    assert 0.1 <= time.monotonic() - start < 5
+    assert watcher.pending == {}
+
+def test_timeouts_are_per_transaction():
+    provider = Provider()
+    watcher = ReceiptWatcher(provider, poll_interval=0.01)
+    short = watcher.watch(PENDING, timeout=0.05)
+    long = watcher.watch(MINED, timeout=5)
+    with pytest.raises(Exception):
+        short.result(5)
+    assert not long.done()
+    provider.manager.receipts[MINED] = receipt(MINED)
+    provider.eth.blockNumber = 2
+    assert long.result(5).transactionHash.hex() == MINED
+
+def test_watching_again_extends_the_deadline():
+    provider = Provider()
+    watcher = ReceiptWatcher(provider, poll_interval=0.01)
+    first = watcher.watch(PENDING, timeout=0.05)
+    assert watcher.watch(PENDING, timeout=5) is first
+    time.sleep(0.2)
+    assert not first.done()
+    provider.manager.receipts[PENDING] = receipt(PENDING)
+    provider.eth.blockNumber = 2
+    assert first.result(5).blockHash is not None
+
+def test_callback_gets_the_receipt():
+    provider = Provider()
+    provider.manager.receipts[MINED] = receipt(MINED)
+    watcher = ReceiptWatcher(provider, poll_interval=0.01)
+    seen = []
+    watcher.watch(MINED, timeout=5, callback=lambda txhash, r: seen.append((txhash, r.blockNumber))).result(5)
+    for _ in range(100):
+        if seen:
+            break
+        time.sleep(0.01)
+    assert seen == [(MINED, 5)]
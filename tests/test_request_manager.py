@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+
+# Retry policy of the shared http session, no network.
+
+from saturnpy.request_manager import createSession
+
+def retry(session, url="http://localhost:8545"):
+    return session.get_adapter(url).max_retries
+
+def test_gets_are_retried():
+    assert retry(createSession()).is_retry("GET", 503)
+    assert retry(createSession()).is_retry("GET", 429)
+
+def test_posts_are_not_sent_twice():
+    # the session carries eth_sendRawTransaction batches, a repeated POST could broadcast twice
+    policy = retry(createSession())
+    for status in (429, 500, 502, 503, 504):
+        assert not policy.is_retry("POST", status)
+    assert not policy._is_method_retryable("POST")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# MarketStore against an in memory database and a stub ticker query, no network.
+
+import sqlite3
+
+import pytest
+
+from saturnpy import store as store_module
+from saturnpy.store import MarketStore
+
+TOKEN = "0xac55641cbb734bdf6510d1bbd62e240c2409040f"
+EXCHANGE_A = "0x5ef83ab1155786f146c5a00722bef7ab683dc0de"
+EXCHANGE_B = "0xaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+
+class Query(object):
+    def __init__(self, book):
+        self.book = book
+
+    def orderbook(self, token):
+        return self.book
+
+def order(order_id, contract, order_type="BUY", balance="100"):
+    return {
+        "order_id": order_id,
+        "transaction": f"0x{order_id:064x}{contract[-4:]}",
+        "contract": contract,
+        "type": order_type,
+        "active": True,
+        "price": "0.0001",
+        "balance": balance,
+        "created_at": "2020-01-01T00:00:00Z"
+    }
+
+def book(*orders):
+    return {
+        "buys": [o for o in orders if o["type"] == "BUY"],
+        "sells": [o for o in orders if o["type"] == "SELL"]
+    }
+
+def test_orders_of_two_contracts_with_the_same_id():
+    store = MarketStore(":memory:", "ETC")
+    assert store.syncOrders(Query(book(order(1, EXCHANGE_A), order(1, EXCHANGE_B, balance="7"))), TOKEN) == 2
+    orders = store.orders(TOKEN)
+    assert [(o["contract"], o["balance"]) for o in orders] == [(EXCHANGE_A, "100"), (EXCHANGE_B, "7")]
+    assert [o["contract"] for o in store.orders(TOKEN, contract=EXCHANGE_B.upper())] == [EXCHANGE_B]
+
+def test_sync_deactivates_orders_missing_from_the_snapshot():
+    store = MarketStore(":memory:", "ETC")
+    store.syncOrders(Query(book(order(1, EXCHANGE_A), order(2, EXCHANGE_A, "SELL"), order(1, EXCHANGE_B))), TOKEN)
+    store.syncOrders(Query(book(order(2, EXCHANGE_A, "SELL"))), TOKEN)
+    assert [(o["contract"], o["order_id"]) for o in store.orders(TOKEN)] == [(EXCHANGE_A, 2)]
+    assert len(store.orders(TOKEN, active=False)) == 2
+    assert len(store.orders(TOKEN, active=None)) == 3
+
+def test_sync_of_one_contract_keeps_the_other():
+    store = MarketStore(":memory:", "ETC")
+    store.syncOrders(Query(book(order(1, EXCHANGE_A), order(1, EXCHANGE_B))), TOKEN)
+    # the snapshot still lists both, only EXCHANGE_A's orders are replaced
+    assert store.syncOrders(Query(book(order(1, EXCHANGE_A, balance="50"), order(1, EXCHANGE_B, balance="1"))), TOKEN, EXCHANGE_A) == 1
+    assert [(o["contract"], o["balance"]) for o in store.orders(TOKEN)] == [(EXCHANGE_A, "50"), (EXCHANGE_B, "100")]
+    store.syncOrders(Query(book()), TOKEN, EXCHANGE_B)
+    assert [o["contract"] for o in store.orders(TOKEN)] == [EXCHANGE_A]
+
+def test_sync_is_one_transaction(monkeypatch):
+    store = MarketStore(":memory:", "ETC")
+    store.syncOrders(Query(book(order(1, EXCHANGE_A))), TOKEN)
+    # the insert fails after the deactivating update ran
+    monkeypatch.setattr(store_module, "INSERT_ORDER", "INSERT INTO missing VALUES (?)")
+    with pytest.raises(sqlite3.OperationalError):
+        store.syncOrders(Query(book(order(2, EXCHANGE_A))), TOKEN)
+    assert [o["order_id"] for o in store.orders(TOKEN)] == [1]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+# iterRecords must give the same records as json.loads, wherever the chunk boundaries fall.
+
+import json
+
+import pytest
+
+from saturnpy.stream import iterRecords
+
+ORDERS = {
+    "sell_orders": [
+        {"id": 1, "note": "quote \" and backslash \\", "nested": {"a": [1, {"b": "}]"}]}},
+        {"id": 2, "name": "ünïcødé €", "empty": {}, "list": []}
+    ],
+    "meta": {"buy_orders": [{"id": "not a top level buy"}], "text": "[{\"x\": 1}]"},
+    "k\"ey": "value",
+    "buy_orders": [{"id": 3, "\\key\"": "v"}, {"id": 4, "trades": [[1, 2], {"id": 5}]}]
+}
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def expected(document, paths):
+    out = []
+    for path in paths:
+        value = document
+        for k in path:
+            value = value[k]
+        out.extend(r for r in value if isinstance(r, dict))
+    return out
+
+@pytest.mark.parametrize("size", list(range(1, 24)) + [64, 10 ** 6])
+def test_records_at_every_chunk_size(size):
+    text = json.dumps(ORDERS, ensure_ascii=False, indent=1)
+    data = text.encode("utf-8")
+    paths = (("sell_orders",), ("buy_orders",))
+    # bytes split inside multi byte characters, str split anywhere
+    assert list(iterRecords(chunked(data, size), paths)) == expected(ORDERS, paths)
+    assert list(iterRecords(chunked(text, size), paths)) == expected(ORDERS, paths)
+
+def test_top_level_array():
+    trades = [{"id": i, "price": "0.1", "s": "\\" * (i % 3) + "\""} for i in range(50)]
+    data = json.dumps(trades, separators=(",", ":")).encode()
+    for size in (1, 2, 3, 7, 100):
+        assert list(iterRecords(chunked(data, size))) == trades
+
+def test_empty_chunks_are_ignored():
+    data = json.dumps([{"s": "a\\\"b"}]).encode()
+    chunks = []
+    for c in chunked(data, 1):
+        chunks.extend([c, b""])
+    assert list(iterRecords(chunks)) == [{"s": "a\\\"b"}]
+
+def test_records_are_yielded_as_they_complete():
+    records = iterRecords(iter([b'[{"id": 1}, {"id"', b': 2}', b', {"id": 3']))
+    assert next(records) == {"id": 1}
+    assert next(records) == {"id": 2}
+    with pytest.raises(Exception, match="TRUNCATED"):
+        next(records)